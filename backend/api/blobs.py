@@ -0,0 +1,115 @@
+from django.utils import timezone
+
+
+# Content-addressed objects live under blobs/<first two hex digits>/<sha256>
+BLOB_KEY_PREFIX = 'blobs'
+
+
+def blob_object_name(sha256):
+    """Storage key for content with the given SHA-256 hex digest"""
+    return f'{BLOB_KEY_PREFIX}/{sha256[:2]}/{sha256}'
+
+
+def find_blob(cursor, sha256):
+    """Return (blob_id, object_key) of the blob holding this content, or None"""
+    cursor.execute(
+        "SELECT id, object_key FROM resume_blobs WHERE sha256 = %s",
+        [sha256]
+    )
+    return cursor.fetchone()
+
+
+def find_stored_digests(cursor, digests):
+    """The subset of the given SHA-256 digests that already have a blob"""
+    cursor.execute(
+        "SELECT sha256 FROM resume_blobs WHERE sha256 = ANY(%s)",
+        [list(digests)]
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def register_blob(cursor, object_key, size=None, content_type=None, sha256=None):
+    """
+    Take one reference on a blob, creating its row if needed, and return (blob_id, object_key, created).
+    Blobs with a digest are shared by content; blobs without one (e.g. presigned uploads) are shared by key,
+    so completing the same key again after its resume was deleted reuses the existing row.
+    When created is True the caller must make sure the object exists before the transaction commits.
+    A concurrent storage_gc pass on the same blob holds its row lock, so this waits for it to finish.
+    """
+    now = timezone.now()
+    # NULL digests never conflict on sha256, so keyless blobs are matched by their object key instead
+    conflict_target = 'sha256' if sha256 is not None else 'object_key'
+    cursor.execute(
+        f"""
+        INSERT INTO resume_blobs (sha256, object_key, size, content_type, ref_count, created_at, updated_at)
+        VALUES (%s, %s, %s, %s, 1, %s, %s)
+        ON CONFLICT ({conflict_target}) DO UPDATE
+        SET ref_count = resume_blobs.ref_count + 1, updated_at = EXCLUDED.updated_at
+        RETURNING id, object_key, (xmax = 0)
+        """,
+        [sha256, object_key, size, content_type, now, now]
+    )
+    return cursor.fetchone()
+
+
+def adopt_legacy_blobs(cursor, resume_ids):
+    """
+    Give live rows stored before deduplication (blob_id IS NULL) a blob for their existing object,
+    counting one reference per row, so they can be shared by later copies.
+    """
+    now = timezone.now()
+    cursor.execute(
+        """
+        WITH legacy AS (
+            SELECT id, object_key FROM resumes
+            WHERE id = ANY(%s) AND blob_id IS NULL AND object_key IS NOT NULL AND (deleted_at IS NULL)
+            FOR UPDATE
+        ),
+        adopted AS (
+            INSERT INTO resume_blobs (object_key, ref_count, created_at, updated_at)
+            SELECT object_key, count(*), %s, %s FROM legacy GROUP BY object_key
+            ON CONFLICT (object_key) DO UPDATE
+            SET ref_count = resume_blobs.ref_count + EXCLUDED.ref_count, updated_at = EXCLUDED.updated_at
+            RETURNING id, object_key
+        )
+        UPDATE resumes r
+        SET blob_id = adopted.id
+        FROM legacy JOIN adopted ON adopted.object_key = legacy.object_key
+        WHERE r.id = legacy.id
+        """,
+        [list(resume_ids), now, now]
+    )
+
+
+def change_blob_references(cursor, blob_ids, delta):
+    """Add delta references per occurrence of each blob id (repeated ids count once per occurrence)"""
+    blob_ids = [blob_id for blob_id in blob_ids if blob_id is not None]
+    if not blob_ids:
+        return
+
+    cursor.execute(
+        """
+        UPDATE resume_blobs b
+        SET ref_count = b.ref_count + v.occurrences * %s, updated_at = %s
+        FROM (
+            SELECT blob_id, count(*) AS occurrences
+            FROM unnest(%s::bigint[]) AS blob_id
+            GROUP BY blob_id
+        ) v
+        WHERE b.id = v.blob_id
+        """,
+        [delta, timezone.now(), blob_ids]
+    )
+
+
+def add_blob_references(cursor, blob_ids):
+    """Count one more live resumes row per blob id"""
+    change_blob_references(cursor, blob_ids, 1)
+
+
+def release_blob_references(cursor, blob_ids):
+    """
+    Count one fewer live resumes row per blob id. Blobs that reach zero are left in place
+    and removed by storage_gc once the retention window has passed.
+    """
+    change_blob_references(cursor, blob_ids, -1)
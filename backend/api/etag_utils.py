@@ -0,0 +1,108 @@
+import hashlib
+
+
+# Each fragment yields "<row count>:<max(updated_at)>" for the rows a payload is built from.
+# Soft deletes bump updated_at and hard deletes change the count, so any change flips the tag.
+USER_DETAILS_ETAG_FRAGMENTS = [
+    "(SELECT concat(count(*), ':', max(updated_at)) FROM users WHERE id = %(user_id)s)",
+    "(SELECT concat(count(*), ':', max(updated_at)) FROM profiles WHERE user_id = %(user_id)s)",
+    "(SELECT concat(count(*), ':', max(updated_at)) FROM projects WHERE user_id = %(user_id)s)",
+    "(SELECT concat(count(*), ':', max(updated_at)) FROM project_settings WHERE user_id = %(user_id)s)",
+    "(SELECT concat(count(*), ':', max(updated_at)) FROM tags WHERE user_id = %(user_id)s)",
+    "(SELECT concat(count(*), ':', max(updated_at)) FROM categories WHERE user_id = %(user_id)s OR user_id IS NULL)",
+    """(
+        SELECT concat(count(*), ':', max(l.updated_at))
+        FROM links l
+        WHERE (l.linkable_type = 'App\\Models\\Profile'
+               AND l.linkable_id IN (SELECT id FROM profiles WHERE user_id = %(user_id)s))
+           OR (l.linkable_type = 'App\\Models\\Project'
+               AND l.linkable_id IN (SELECT id FROM projects WHERE user_id = %(user_id)s))
+    )""",
+    """(
+        SELECT concat(count(*), ':', max(a.updated_at))
+        FROM assets a
+        WHERE a.assetable_type = 'App\\Models\\Profile'
+          AND a.assetable_id IN (SELECT id FROM profiles WHERE user_id = %(user_id)s)
+    )""",
+    """(
+        SELECT concat(count(*), ':', max(sc.updated_at))
+        FROM skill_categories sc
+        WHERE sc.id IN (
+            SELECT s.category_id FROM skills s
+            JOIN profiles p ON s.profile_id = p.id
+            WHERE p.user_id = %(user_id)s
+        )
+    )""",
+    "(SELECT concat(count(*), ':', max(updated_at)) FROM link_types)",
+    "(SELECT concat(count(*), ':', max(updated_at)) FROM asset_types)",
+    "(SELECT concat(count(*), ':', max(updated_at)) FROM status)",
+] + [
+    f"""(
+        SELECT concat(count(*), ':', max(t.updated_at))
+        FROM {table} t
+        JOIN profiles p ON t.profile_id = p.id
+        WHERE p.user_id = %(user_id)s
+    )"""
+    for table in ('certifications', 'achievements', 'experiences', 'publications', 'skills', 'education')
+]
+
+RESUME_TREE_ETAG_FRAGMENTS = [
+    "(SELECT concat(count(*), ':', max(updated_at)) FROM users WHERE id = %(user_id)s)",
+    "(SELECT concat(count(*), ':', max(updated_at)) FROM profiles WHERE user_id = %(user_id)s)",
+    """(
+        SELECT concat(count(*), ':', max(f.updated_at))
+        FROM folders f
+        JOIN profiles p ON f.profile_id = p.id
+        WHERE p.user_id = %(user_id)s
+    )""",
+    """(
+        SELECT concat(count(*), ':', max(r.updated_at))
+        FROM resumes r
+        JOIN profiles p ON r.profile_id = p.id
+        WHERE p.user_id = %(user_id)s
+    )""",
+]
+
+
+def compute_etag(cursor, fragments, user_id_int, variant=''):
+    """
+    Compute a strong ETag from row counts and max(updated_at) of the given fragments.
+    Runs a single cheap query instead of building and hashing the full payload.
+    """
+    cursor.execute(
+        f"SELECT concat_ws('|', {', '.join(fragments)})",
+        {'user_id': user_id_int}
+    )
+    fingerprint = cursor.fetchone()[0] or ''
+    digest = hashlib.sha256(f'{variant}|{fingerprint}'.encode('utf-8')).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def compute_user_details_etag(cursor, user_id_int, variant=''):
+    """Strong ETag for the /users/<id>/details/ payload"""
+    return compute_etag(cursor, USER_DETAILS_ETAG_FRAGMENTS, user_id_int, f'details:{variant}')
+
+
+def compute_resume_tree_etag(cursor, user_id_int, variant=''):
+    """Strong ETag for the /users/<id>/resumes/ tree"""
+    return compute_etag(cursor, RESUME_TREE_ETAG_FRAGMENTS, user_id_int, f'resumes:{variant}')
+
+
+def etag_matches(request, etag):
+    """Check whether the request's If-None-Match header matches the given strong ETag"""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+
+    if header.strip() == '*':
+        return True
+
+    return etag in [candidate.strip() for candidate in header.split(',')]
+
+
+def etag_headers(etag):
+    """Response headers that let clients revalidate with If-None-Match on every use"""
+    return {
+        'ETag': etag,
+        'Cache-Control': 'private, no-cache',
+    }
@@ -1,13 +1,195 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from django.db import connection
+from django.http import HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe, content_disposition_header
+from django.db import connection, transaction
 from django.utils import timezone
 import os
 import re
+import base64
+import json
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from urllib.parse import urlparse
-from .minio_utils import upload_file, get_public_url, get_minio_client, MINIO_BUCKET, download_file
+from .etag_utils import compute_resume_tree_etag, etag_matches, etag_headers
+from .identity import resolve_identity
+from .idempotency import idempotent
+from .storage_purger import enqueue_purge
+from .search_index import schedule_indexing, TEXT_SEARCH_CONFIG
+from .storage_usage import get_storage_quota, get_storage_usage, change_storage_usage, StorageQuotaExceeded
+from .blobs import (
+    blob_object_name, find_blob, find_stored_digests, register_blob, adopt_legacy_blobs, add_blob_references,
+    release_blob_references
+)
+from .storage import get_storage, PresignNotSupported
+from .minio_utils import (
+    get_object_name_from_url, ValidatingUploadStream, UploadValidationError, MINIO_PRESIGN_EXPIRY_SECONDS,
+    UPLOAD_PART_SIZE
+)
+
+
+MAX_RESUME_FILE_SIZE = 10 * 1024 * 1024  # 10MB in bytes
+
+RESUME_CONTENT_TYPES = {
+    '.pdf': 'application/pdf',
+    '.doc': 'application/msword',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+}
+
+# Leading bytes of each allowed format, checked while the upload streams to storage
+RESUME_FILE_SIGNATURES = {
+    '.pdf': [b'%PDF-'],
+    '.doc': [b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'],
+    '.docx': [b'PK\x03\x04'],
+}
+
+
+def validate_resume_file(filename, size):
+    """
+    Validate a resume's name and size before any storage I/O.
+    Returns an error message, or None if the file is acceptable.
+    """
+    if size == 0:
+        return 'File is empty.'
+
+    if size > MAX_RESUME_FILE_SIZE:
+        return f'File size too large. Maximum size is 10MB. Your file is {size / (1024 * 1024):.2f}MB.'
+
+    file_extension = os.path.splitext(filename)[1].lower()
+    if file_extension not in RESUME_CONTENT_TYPES:
+        return f'Invalid file type. Allowed types: {", ".join(RESUME_CONTENT_TYPES)}'
+
+    return None
+
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+MAX_UPLOAD_FILES = 50
+UPLOAD_WORKERS = int(os.getenv('UPLOAD_WORKERS', '4'))
+
+# Objects fetched ahead of the one being written into an export archive; bounds export memory
+# to roughly (EXPORT_PREFETCH + 1) * MAX_RESUME_FILE_SIZE regardless of the folder size
+EXPORT_PREFETCH = int(os.getenv('EXPORT_PREFETCH', '4'))
+
+BULK_OPERATIONS = ('move', 'copy', 'delete', 'rename')
+MAX_BULK_ITEMS = 500
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+FOLDER_LISTING_DEFAULT_LIMIT = 50
+FOLDER_LISTING_MAX_LIMIT = 200
+
+
+def encode_listing_cursor(created_at, resume_id):
+    """Opaque keyset cursor for the folder listing"""
+    payload = json.dumps({'c': created_at.isoformat(), 'i': resume_id})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_listing_cursor(cursor_value):
+    """Decode a cursor from encode_listing_cursor into (created_at, id); raises ValueError if malformed"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor_value.encode('ascii')))
+        return datetime.fromisoformat(payload['c']), int(payload['i'])
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def get_folder_key_from_object_name(object_name):
+    """
+    Folder key of an object named by build_resume_object_name ('' for root level files).
+    Example: "alice/resumes/DevOps/Pipelines/20240101_120000_cv.pdf" -> "DevOps/Pipelines"
+    """
+    remaining_parts = [p for p in (object_name or '').split('/') if p][1:]
+
+    if remaining_parts and remaining_parts[0] == 'resumes':
+        remaining_parts = remaining_parts[1:]
+
+    return '/'.join(remaining_parts[:-1])
+
+
+def fill_missing_resume_keys(cursor, profile_id, resume_ids=None):
+    """
+    Derive object_key and folder_key from the public URL for a profile's live rows that
+    backfill_resume_keys has not reached yet (only resume_ids, when given), so key-based
+    queries and blob adoption see them. Rows without a parsable URL are left as they are.
+    """
+    id_condition = 'AND id = ANY(%s)' if resume_ids is not None else ''
+    params = [profile_id] + ([list(resume_ids)] if resume_ids is not None else [])
+    cursor.execute(
+        f"""
+        SELECT id, url, object_key FROM resumes
+        WHERE profile_id = %s AND (deleted_at IS NULL) AND (object_key IS NULL OR folder_key IS NULL)
+        {id_condition}
+        """,
+        params
+    )
+
+    ids, object_keys, folder_keys = [], [], []
+    for resume_id, url, object_key in cursor.fetchall():
+        object_key = object_key or get_object_name_from_url(url or '')
+        if not object_key:
+            continue
+        ids.append(resume_id)
+        object_keys.append(object_key)
+        folder_keys.append(get_folder_key_from_object_name(object_key))
+
+    if ids:
+        cursor.execute(
+            """
+            UPDATE resumes r
+            SET object_key = COALESCE(r.object_key, v.object_key), folder_key = COALESCE(r.folder_key, v.folder_key)
+            FROM unnest(%s::bigint[], %s::text[], %s::text[]) AS v(id, object_key, folder_key)
+            WHERE r.id = v.id
+            """,
+            [ids, object_keys, folder_keys]
+        )
+
+
+def parse_range_header(range_header, size):
+    """
+    Parse a single-range "bytes=start-end" header against an object of the given size.
+    Returns (start, end) inclusive, or None to serve the whole object
+    (no header, or a multi-range/unsupported form).
+    Raises ValueError if the range is unsatisfiable.
+    """
+    if not range_header or not range_header.startswith('bytes='):
+        return None
+
+    range_spec = range_header[len('bytes='):].strip()
+    if ',' in range_spec or '-' not in range_spec:
+        return None
+
+    start_str, end_str = range_spec.split('-', 1)
+    try:
+        if not start_str:
+            suffix_length = int(end_str)
+            if suffix_length <= 0:
+                raise ValueError('Unsatisfiable range')
+            return max(size - suffix_length, 0), size - 1
+
+        start = int(start_str)
+        end = int(end_str) if end_str else size - 1
+    except ValueError:
+        raise ValueError('Unsatisfiable range')
+
+    if start >= size or end < start:
+        raise ValueError('Unsatisfiable range')
+
+    return start, min(end, size - 1)
+
+
+def build_resume_object_name(username, folder_key, filename):
+    """Build a timestamped object name under the user's resumes prefix"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    safe_filename = filename.replace(' ', '_')
+
+    if folder_key:
+        return f"{username}/resumes/{folder_key}/{timestamp}_{safe_filename}"
+
+    return f"{username}/resumes/{timestamp}_{safe_filename}"
 
 
 def convert_folder_path_to_key(cursor, profile_id, folder_path):
@@ -15,6 +197,7 @@ def convert_folder_path_to_key(cursor, profile_id, folder_path):
     Convert folder_path (using folder names from UI) to folder_key.
     Returns folder_key string or None if not found.
     Example: "DevOps/Pipelines-rename" -> "DevOps/Pipelines" (uses folder_key, not folder_name)
+    Resolves the whole path in one recursive query, one level of the folder tree per path segment.
     """
     if not folder_path:
         return ''
@@ -27,44 +210,157 @@ def convert_folder_path_to_key(cursor, profile_id, folder_path):
     folder_names = folder_path.split('/')
     
 
-    current_parent_key = None
-    for folder_name in folder_names:
+    # Each step follows a direct child of the previous key (exact prefix comparison, since
+    # folder names may contain LIKE wildcards such as "_")
+    cursor.execute(
+        """
+        WITH RECURSIVE segments AS (
+            SELECT folder_name, depth
+            FROM unnest(%s::text[]) WITH ORDINALITY AS s(folder_name, depth)
+        ),
+        walk AS (
+            SELECT 1::bigint AS depth, f.folder_key
+            FROM folders f
+            JOIN segments s ON s.depth = 1
+            WHERE f.profile_id = %s AND f.folder_name = s.folder_name
+              AND position('/' in f.folder_key) = 0 AND (f.deleted_at IS NULL)
+            UNION ALL
+            SELECT w.depth + 1, f.folder_key
+            FROM walk w
+            JOIN segments s ON s.depth = w.depth + 1
+            JOIN folders f ON f.profile_id = %s AND f.folder_name = s.folder_name
+              AND left(f.folder_key, length(w.folder_key) + 1) = w.folder_key || '/'
+              AND position('/' in substr(f.folder_key, length(w.folder_key) + 2)) = 0
+              AND (f.deleted_at IS NULL)
+        )
+        SELECT folder_key FROM walk
+        WHERE depth = %s
+        ORDER BY folder_key
+        LIMIT 1
+        """,
+        [folder_names, profile_id, profile_id, len(folder_names)]
+    )
+    
+    folder_row = cursor.fetchone()
+    return folder_row[0] if folder_row else None
 
-        if current_parent_key:
 
-            cursor.execute(
-                """
-                SELECT folder_key FROM folders 
-                WHERE profile_id = %s AND folder_name = %s 
-                AND folder_key LIKE %s AND (deleted_at IS NULL)
-                LIMIT 1
-                """,
-                [profile_id, folder_name, f"{current_parent_key}/%"]
-            )
-        else:
+class ZipStreamBuffer:
+    """
+    Write-only, unseekable sink for zipfile. zipfile falls back to data descriptors when it
+    cannot seek, so archive bytes can be handed to the response as soon as they are written.
+    """
 
-            cursor.execute(
-                """
-                SELECT folder_key FROM folders 
-                WHERE profile_id = %s AND folder_name = %s 
-                AND folder_key NOT LIKE %s AND (deleted_at IS NULL)
-                LIMIT 1
-                """,
-                [profile_id, folder_name, '%/%']
-            )
-        
-        folder_row = cursor.fetchone()
-        if not folder_row:
-            return None  # Folder not found
-        
+    def __init__(self):
+        self._chunks = []
 
-        current_parent_key = folder_row[0]
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip_archive(entries):
+    """
+    Yield a ZIP archive of entries, a list of (archive path, object name, modified datetime).
+    Each object is streamed into its entry chunk by chunk, stored without recompression (PDF and DOCX
+    are already compressed). The next EXPORT_PREFETCH objects are opened ahead on a thread pool, so
+    memory stays bounded by one chunk per open object. Objects that cannot be read are listed in
+    EXPORT_ERRORS.txt at the end of the archive instead of aborting the download.
+    """
+    sink = ZipStreamBuffer()
+    errors = []
+    executor = ThreadPoolExecutor(max_workers=max(1, EXPORT_PREFETCH))
+    pending = []
+    next_index = 0
+    
+    def open_object(object_name):
+        # Reading the first chunk sends the request, so a missing object fails here, before its entry is written
+        chunks = get_storage().get_stream(object_name, chunk_size=DOWNLOAD_CHUNK_SIZE)
+        try:
+            return next(chunks, b''), chunks
+        except Exception:
+            chunks.close()
+            raise
     
+    try:
+        with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED) as archive:
+            while next_index < len(entries) or pending:
+                while next_index < len(entries) and len(pending) <= EXPORT_PREFETCH:
+                    pending.append((entries[next_index], executor.submit(open_object, entries[next_index][1])))
+                    next_index += 1
+                
+                (arcname, object_name, modified_at), future = pending.pop(0)
+                try:
+                    first_chunk, chunks = future.result()
+                except Exception as e:
+                    errors.append(f'{arcname}: {str(e)}')
+                    continue
+                
+                info = zipfile.ZipInfo(arcname, date_time=(modified_at or timezone.now()).timetuple()[:6])
+                info.compress_type = zipfile.ZIP_STORED
+                try:
+                    with archive.open(info, mode='w') as entry:
+                        entry.write(first_chunk)
+                        yield sink.drain()
+                        for chunk in chunks:
+                            entry.write(chunk)
+                            yield sink.drain()
+                except Exception as e:
+                    errors.append(f'{arcname}: incomplete, {str(e)}')
+                finally:
+                    chunks.close()
+                yield sink.drain()
+            
+            if errors:
+                archive.writestr('EXPORT_ERRORS.txt', '\n'.join(errors) + '\n')
+        
+        yield sink.drain()
+    finally:
+        # Also runs when the client disconnects mid-download
+        executor.shutdown(wait=False, cancel_futures=True)
+        for _, future in pending:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                future.result()[1].close()
+
 
-    return current_parent_key
+def hash_resume_upload(file, file_extension):
+    """
+    Hash an uploaded file in one streaming pass, checking size and content signature as the bytes
+    flow through, so content that is already stored never has to be sent to storage again.
+    Returns (sha256 hex digest, size); raises UploadValidationError. Leaves the file rewound.
+    """
+    hashing_source = ValidatingUploadStream(
+        file,
+        max_size=MAX_RESUME_FILE_SIZE,
+        signatures=RESUME_FILE_SIGNATURES.get(file_extension)
+    )
+    file.seek(0)
+    while hashing_source.read(UPLOAD_PART_SIZE):
+        pass
+    file.seek(0)
+    return hashing_source.hexdigest(), hashing_source.bytes_read
+
+
+def ensure_blob_object(storage, object_name, file, size, content_type):
+    """
+    Called when a blob row was just created. The content was normally stored before the transaction,
+    but storage_gc may have removed an unreferenced blob's object in between; store it again if so.
+    """
+    if storage.stat(object_name) is None:
+        file.seek(0)
+        storage.put(object_name, file, size, content_type)
 
 
 @api_view(['POST'])
+@idempotent('upload_resume')
 def upload_resume(request):
     """
     Upload resume file to MinIO and save entry to resumes table.
@@ -99,70 +395,575 @@ def upload_resume(request):
         file = request.FILES['file']
         
 
-        if file.size == 0:
+        validation_error = validate_resume_file(file.name, file.size)
+        if validation_error:
             return Response(
-                {'error': 'File is empty.'},
+                {'error': validation_error},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        file_extension = os.path.splitext(file.name)[1].lower()
+        
+        with connection.cursor() as cursor:
 
-        max_file_size = 10 * 1024 * 1024  # 10MB in bytes
-        if file.size > max_file_size:
+            identity = resolve_identity(request, cursor, user_id_int)
+            
+            if not identity:
+                return Response(
+                    {'error': f'User with id {user_id_int} does not exist.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+
+            if not identity.profile_id:
+                return Response(
+                    {'error': f'Profile not found for user_id {user_id_int}.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            profile_id = identity.profile_id
+            
+
+
+            folder_path = request.data.get('folder_path', '')
+            
+
+            folder_key = convert_folder_path_to_key(cursor, profile_id, folder_path)
+            if folder_path and folder_key is None:
+                return Response(
+                    {'error': f'Folder with path "{folder_path}" does not exist. Please create the folder first.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+
+            safe_filename = file.name.replace(' ', '_')
+            content_type = RESUME_CONTENT_TYPES.get(file_extension, 'application/octet-stream')
+            
+
+            try:
+                digest, size = hash_resume_upload(file, file_extension)
+            except UploadValidationError as e:
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            upload_stats = {'bytes': 0, 'seconds': 0.0, 'throughput_bytes_per_second': None}
+            quota = get_storage_quota(cursor, user_id_int)
+            storage = get_storage()
+            
+            # Fail fast before sending any bytes; the counter is checked again under its row lock below
+            used_bytes, _ = get_storage_usage(cursor, profile_id)
+            if used_bytes + size > quota:
+                return Response(
+                    {'error': f'Storage quota of {quota} bytes exceeded'},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                )
+            
+
+            try:
+                # New content is stored before the transaction, so no row lock is held during the transfer.
+                # Objects are content-addressed, so racing uploads of the same bytes write the same object,
+                # and one whose row never commits is removed by storage_gc after the retention window.
+                if not find_blob(cursor, digest):
+                    upload_stats = storage.put(blob_object_name(digest), file, file.size, content_type)
+                
+                with transaction.atomic():
+                    change_storage_usage(cursor, profile_id, size, 1, quota)
+                    
+                    blob_id, object_name, created = register_blob(
+                        cursor, blob_object_name(digest), size, content_type, sha256=digest
+                    )
+                    
+                    if created:
+                        ensure_blob_object(storage, object_name, file, size, content_type)
+                        transaction.on_commit(lambda: schedule_indexing([blob_id]))
+                    
+                    public_url = storage.public_url(object_name)
+                    
+                    cursor.execute(
+                        """
+                        INSERT INTO resumes (profile_id, url, filename, object_key, folder_key, blob_id, size, created_at, updated_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        RETURNING id
+                        """,
+                        [profile_id, public_url, safe_filename, object_name, folder_key or '', blob_id, size, timezone.now(), timezone.now()]
+                    )
+                    resume_id = cursor.fetchone()[0]
+            except StorageQuotaExceeded as e:
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                )
+            except Exception as e:
+                return Response(
+                    {'error': f'Failed to store resume: {str(e)}'},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+            
+            return Response({
+                'success': True,
+                'message': 'Resume uploaded successfully',
+                'resume_id': resume_id,
+                'url': public_url,
+                'filename': safe_filename,
+                'profile_id': profile_id,
+                'deduplicated': not created,
+                'upload_stats': {
+                    'bytes': upload_stats['bytes'],
+                    'seconds': upload_stats['seconds'],
+                    'throughput_bytes_per_second': upload_stats['throughput_bytes_per_second']
+                }
+            }, status=status.HTTP_201_CREATED)
+    
+    except Exception as e:
+        return Response(
+            {'error': f'Internal server error: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['POST'])
+@idempotent('upload_resumes')
+def upload_resumes(request):
+    """
+    Upload many resume files in one multipart request.
+    Expects: user_id, files (repeated form field), folder_path (optional)
+    Once the user and folder are resolved, every file is validated and hashed; new contents are uploaded
+    to storage in parallel, and all rows are inserted with a single multi-row INSERT. Returns a status for every file.
+    """
+    try:
+        user_id = request.data.get('user_id')
+        files = request.FILES.getlist('files')
+        folder_path = request.data.get('folder_path', '')
+        
+        if not user_id:
             return Response(
-                {'error': f'File size too large. Maximum size is 10MB. Your file is {file.size / (1024 * 1024):.2f}MB.'},
+                {'error': 'user_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not files:
+            return Response(
+                {'error': 'No files provided. Please upload at least one file.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if len(files) > MAX_UPLOAD_FILES:
+            return Response(
+                {'error': f'At most {MAX_UPLOAD_FILES} files can be uploaded at once'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
 
-        allowed_extensions = ['.pdf', '.doc', '.docx']
-        file_extension = os.path.splitext(file.name)[1].lower()
+        try:
+            user_id_int = int(user_id)
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid user_id. Must be a valid integer.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+
+        with connection.cursor() as cursor:
+
+            identity = resolve_identity(request, cursor, user_id_int)
+            
+            if not identity:
+                return Response(
+                    {'error': f'User with id {user_id_int} does not exist.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+
+            if not identity.profile_id:
+                return Response(
+                    {'error': f'Profile not found for user_id {user_id_int}.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            profile_id = identity.profile_id
+            
+
+            folder_key = convert_folder_path_to_key(cursor, profile_id, folder_path)
+            if folder_path and folder_key is None:
+                return Response(
+                    {'error': f'Folder with path "{folder_path}" does not exist. Please create the folder first.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+
+            # Validate and hash every file once the user is known, before touching storage
+            results = [{'filename': file.name, 'success': False} for file in files]
+            accepted = []
+            for index, file in enumerate(files):
+                validation_error = validate_resume_file(file.name, file.size)
+                if validation_error:
+                    results[index]['error'] = validation_error
+                    continue
+                
+                file_extension = os.path.splitext(file.name)[1].lower()
+                try:
+                    digest, size = hash_resume_upload(file, file_extension)
+                except UploadValidationError as e:
+                    results[index]['error'] = str(e)
+                    continue
+                
+                accepted.append({
+                    'index': index,
+                    'file': file,
+                    'digest': digest,
+                    'size': size,
+                    'filename': file.name.replace(' ', '_'),
+                    'content_type': RESUME_CONTENT_TYPES.get(file_extension, 'application/octet-stream')
+                })
+            
+
+            upload_errors = {}
+            if accepted:
+                quota = get_storage_quota(cursor, user_id_int)
+                storage = get_storage()
+                
+                # Fail fast before sending any bytes; the counter is checked again under its row lock below
+                used_bytes, _ = get_storage_usage(cursor, profile_id)
+                if used_bytes + sum(item['size'] for item in accepted) > quota:
+                    return Response(
+                        {'error': f'Storage quota of {quota} bytes exceeded'},
+                        status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                    )
+                
+
+                # New contents are stored in parallel before the transaction, so no row lock is held
+                # during the transfers; objects whose rows never commit are removed by storage_gc
+                stored_digests = find_stored_digests(cursor, [item['digest'] for item in accepted])
+                uploads = {}
+                for item in accepted:
+                    if item['digest'] not in stored_digests:
+                        uploads.setdefault(item['digest'], item)
+                
+
+                def run_upload(item):
+                    try:
+                        storage.put(
+                            blob_object_name(item['digest']), item['file'], item['size'], item['content_type']
+                        )
+                        return item['digest'], None
+                    except Exception as e:
+                        return item['digest'], str(e)
+                
+                if uploads:
+                    with ThreadPoolExecutor(max_workers=max(1, min(UPLOAD_WORKERS, len(uploads)))) as executor:
+                        upload_errors = {
+                            digest: error
+                            for digest, error in executor.map(run_upload, uploads.values())
+                            if error
+                        }
+                
+                stored = []
+                for item in accepted:
+                    error = upload_errors.get(item['digest'])
+                    if error:
+                        results[item['index']]['error'] = f'Failed to upload file to storage: {error}'
+                    else:
+                        stored.append(item)
+                
+
+                if stored:
+                    try:
+                        with transaction.atomic():
+                            change_storage_usage(
+                                cursor, profile_id, sum(item['size'] for item in stored), len(stored), quota
+                            )
+                            
+                            # Blob rows are taken in digest order so concurrent batches cannot deadlock
+                            new_blob_ids = []
+                            for item in sorted(stored, key=lambda item: item['digest']):
+                                blob_id, object_name, created = register_blob(
+                                    cursor, blob_object_name(item['digest']), item['size'], item['content_type'],
+                                    sha256=item['digest']
+                                )
+                                item.update(blob_id=blob_id, object_name=object_name, deduplicated=not created)
+                                if created:
+                                    ensure_blob_object(
+                                        storage, object_name, item['file'], item['size'], item['content_type']
+                                    )
+                                    new_blob_ids.append(blob_id)
+                            
+
+                            # Ids are drawn up front so every returned row maps back to its file
+                            cursor.execute(
+                                "SELECT nextval(pg_get_serial_sequence('resumes', 'id')) FROM generate_series(1, %s)",
+                                [len(stored)]
+                            )
+                            new_ids = [row[0] for row in cursor.fetchall()]
+                            
+                            now = timezone.now()
+                            values = []
+                            params = []
+                            for new_id, item in zip(new_ids, stored):
+                                item['resume_id'] = new_id
+                                item['url'] = storage.public_url(item['object_name'])
+                                values.append('(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)')
+                                params.extend([
+                                    new_id, profile_id, item['url'], item['filename'], item['object_name'],
+                                    folder_key or '', item['blob_id'], item['size'], now, now
+                                ])
+                            
+                            cursor.execute(
+                                f"""
+                                INSERT INTO resumes (id, profile_id, url, filename, object_key, folder_key, blob_id, size, created_at, updated_at)
+                                VALUES {', '.join(values)}
+                                RETURNING id
+                                """,
+                                params
+                            )
+                            cursor.fetchall()
+                            
+                            transaction.on_commit(lambda: schedule_indexing(new_blob_ids))
+                    except StorageQuotaExceeded as e:
+                        return Response(
+                            {'error': str(e)},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                        )
+                    except Exception as e:
+                        return Response(
+                            {'error': f'Failed to store resumes: {str(e)}'},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                        )
+                
+                for item in stored:
+                    results[item['index']].update({
+                        'success': True,
+                        'resume_id': item['resume_id'],
+                        'url': item['url'],
+                        'filename': item['filename'],
+                        'deduplicated': item['deduplicated']
+                    })
+            
+            succeeded = sum(1 for result in results if result['success'])
+            
+            if succeeded:
+                response_status = status.HTTP_201_CREATED
+            elif upload_errors:
+                # Storage failures are transient: a 5xx is not stored by @idempotent, so a retry uploads again
+                response_status = status.HTTP_502_BAD_GATEWAY
+            else:
+                response_status = status.HTTP_400_BAD_REQUEST
+            
+            return Response({
+                'success': succeeded == len(results),
+                'profile_id': profile_id,
+                'succeeded': succeeded,
+                'failed': len(results) - succeeded,
+                'results': results
+            }, status=response_status)
+    
+    except Exception as e:
+        return Response(
+            {'error': f'Internal server error: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['POST'])
+def create_upload_intent(request):
+    """
+    Start a direct-to-storage resume upload.
+    Validates the user, folder and file (same rules as upload_resume) and returns a presigned POST policy
+    that only accepts the declared size and content type at the issued key.
+    The browser POSTs the fields and then the file straight to MinIO, then calls complete_upload.
+    Expects: user_id, filename, size, folder_path (optional)
+    """
+    try:
+        user_id = request.data.get('user_id')
+        filename = request.data.get('filename')
+        size = request.data.get('size')
+        folder_path = request.data.get('folder_path', '')
+        
+        if not user_id:
+            return Response(
+                {'error': 'user_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not filename:
+            return Response(
+                {'error': 'filename is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+
+        try:
+            user_id_int = int(user_id)
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid user_id. Must be a valid integer.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        if file_extension not in allowed_extensions:
+
+        try:
+            size_int = int(size)
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid size. Must be the file size in bytes.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+
+        validation_error = validate_resume_file(filename, size_int)
+        if validation_error:
             return Response(
-                {'error': f'Invalid file type. Allowed types: {", ".join(allowed_extensions)}'},
+                {'error': validation_error},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        file_extension = os.path.splitext(filename)[1].lower()
+        
         with connection.cursor() as cursor:
 
-            cursor.execute("SELECT id, username FROM users WHERE id = %s", [user_id_int])
-            user_row = cursor.fetchone()
+            identity = resolve_identity(request, cursor, user_id_int)
             
-            if not user_row:
+            if not identity:
                 return Response(
                     {'error': f'User with id {user_id_int} does not exist.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            user_id_db, username = user_row
+
+            if not identity.profile_id:
+                return Response(
+                    {'error': f'Profile not found for user_id {user_id_int}.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            profile_id = identity.profile_id
             
 
-            cursor.execute(
-                "SELECT id FROM profiles WHERE user_id = %s LIMIT 1",
-                [user_id_int]
+            folder_key = convert_folder_path_to_key(cursor, profile_id, folder_path)
+            if folder_path and folder_key is None:
+                return Response(
+                    {'error': f'Folder with path "{folder_path}" does not exist. Please create the folder first.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+
+            # Checked again with the stored size when the upload is completed
+            quota = get_storage_quota(cursor, user_id_int)
+            used_bytes, _ = get_storage_usage(cursor, profile_id)
+            if used_bytes + size_int > quota:
+                return Response(
+                    {'error': f'Storage quota of {quota} bytes exceeded'},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                )
+        
+
+        object_name = build_resume_object_name(identity.username, folder_key, filename)
+        content_type = RESUME_CONTENT_TYPES.get(file_extension, 'application/octet-stream')
+        
+        try:
+            upload_url, upload_fields = get_storage().presign_upload(object_name, content_type, size_int)
+        except PresignNotSupported as e:
+            return Response(
+                {'error': f'{str(e)}. Use the upload-resume endpoint instead.'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        except Exception as e:
+            return Response(
+                {'error': f'Failed to create upload URL: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-            profile_row = cursor.fetchone()
+        
+        return Response({
+            'success': True,
+            'upload_url': upload_url,
+            'method': 'POST',
+            'fields': upload_fields,
+            'object_key': object_name,
+            'filename': filename.replace(' ', '_'),
+            'expires_in': MINIO_PRESIGN_EXPIRY_SECONDS
+        }, status=status.HTTP_201_CREATED)
+    
+    except Exception as e:
+        return Response(
+            {'error': f'Internal server error: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['POST'])
+def complete_upload(request):
+    """
+    Finish a direct-to-storage upload started with create_upload_intent.
+    Verifies the object with stat_object (size and content signature) and saves the resumes row.
+    Expects: user_id, object_key, filename
+    """
+    try:
+        user_id = request.data.get('user_id')
+        object_key = request.data.get('object_key')
+        filename = request.data.get('filename')
+        
+        if not user_id:
+            return Response(
+                {'error': 'user_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not object_key:
+            return Response(
+                {'error': 'object_key is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not filename:
+            return Response(
+                {'error': 'filename is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+
+        try:
+            user_id_int = int(user_id)
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid user_id. Must be a valid integer.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        safe_filename = filename.replace(' ', '_')
+        file_extension = os.path.splitext(safe_filename)[1].lower()
+        
+        with connection.cursor() as cursor:
+
+            identity = resolve_identity(request, cursor, user_id_int)
+            
+            if not identity:
+                return Response(
+                    {'error': f'User with id {user_id_int} does not exist.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
             
-            if not profile_row:
+
+            if not identity.profile_id:
                 return Response(
                     {'error': f'Profile not found for user_id {user_id_int}.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            profile_id = profile_row[0]
-            
-
-
-            folder_path = request.data.get('folder_path', '')
+            profile_id = identity.profile_id
             
 
-            folder_key = convert_folder_path_to_key(cursor, profile_id, folder_path)
-            if folder_path and folder_key is None:
+            # The key must be one create_upload_intent could have issued for this user
+            user_prefix = f"{identity.username}/resumes/"
+            relative_key = object_key[len(user_prefix):] if object_key.startswith(user_prefix) else None
+            if not relative_key or '..' in relative_key.split('/') or not relative_key.endswith(f'_{safe_filename}'):
                 return Response(
-                    {'error': f'Folder with path "{folder_path}" does not exist. Please create the folder first.'},
-                    status=status.HTTP_404_NOT_FOUND
+                    {'error': 'object_key does not belong to this user or does not match filename.'},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
             
+            folder_key = relative_key.rsplit('/', 1)[0] if '/' in relative_key else ''
+            
 
             if folder_key:
 
@@ -182,51 +983,85 @@ def upload_resume(request):
                     )
             
 
-            file_data = file.read()
-            file.seek(0)  # Reset file pointer
-            
-
-
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            safe_filename = file.name.replace(' ', '_')
+            public_url = get_storage().public_url(object_key)
             
-            if folder_key:
-                object_name = f"{username}/resumes/{folder_key}/{timestamp}_{safe_filename}"
-            else:
 
-                object_name = f"{username}/resumes/{timestamp}_{safe_filename}"
+            cursor.execute(
+                """
+                SELECT id FROM resumes 
+                WHERE profile_id = %s AND url = %s AND (deleted_at IS NULL)
+                """,
+                [profile_id, public_url]
+            )
+            existing_resume = cursor.fetchone()
             
-
-            content_type_map = {
-                '.pdf': 'application/pdf',
-                '.doc': 'application/msword',
-                '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            }
-            content_type = content_type_map.get(file_extension, 'application/octet-stream')
+            if existing_resume:
+                return Response({
+                    'success': True,
+                    'message': 'Resume upload already completed',
+                    'resume_id': existing_resume[0],
+                    'url': public_url,
+                    'filename': safe_filename,
+                    'profile_id': profile_id
+                }, status=status.HTTP_200_OK)
             
 
             try:
-                upload_file(MINIO_BUCKET, object_name, file_data, content_type)
+                object_stat = get_storage().stat(object_key)
             except Exception as e:
                 return Response(
-                    {'error': f'Failed to upload file to storage: {str(e)}'},
+                    {'error': f'Failed to verify uploaded file: {str(e)}'},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
             
+            if not object_stat:
+                return Response(
+                    {'error': 'Uploaded file not found in storage. Upload the file before completing.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
 
-            public_url = get_public_url(MINIO_BUCKET, object_name)
+            validation_error = validate_resume_file(safe_filename, object_stat.size)
+            if not validation_error:
+                signatures = RESUME_FILE_SIGNATURES.get(file_extension, [])
+                head = get_storage().read(object_key, 0, max(len(sig) for sig in signatures))
+                if not any(head.startswith(sig) for sig in signatures):
+                    validation_error = 'File content does not match its declared type'
+            
+            if validation_error:
+                try:
+                    get_storage().delete_many([object_key])
+                except Exception as e:
+                    print(f'Error removing rejected upload {object_key}: {e}')
+                return Response(
+                    {'error': validation_error},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
 
+            quota = get_storage_quota(cursor, user_id_int)
+            
             try:
-                cursor.execute(
-                    """
-                    INSERT INTO resumes (profile_id, url, filename, created_at, updated_at)
-                    VALUES (%s, %s, %s, %s, %s)
-                    RETURNING id
-                    """,
-                    [profile_id, public_url, safe_filename, timezone.now(), timezone.now()]
-                )
-                resume_id = cursor.fetchone()[0]
+                # The bytes never passed through here, so the blob is keyed by object rather than by content
+                with transaction.atomic():
+                    change_storage_usage(cursor, profile_id, object_stat.size, 1, quota)
+                    
+                    blob_id, _, _ = register_blob(
+                        cursor, object_key, object_stat.size, object_stat.content_type
+                    )
+                    transaction.on_commit(lambda: schedule_indexing([blob_id]))
+                    cursor.execute(
+                        """
+                        INSERT INTO resumes (profile_id, url, filename, object_key, folder_key, blob_id, size, created_at, updated_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        RETURNING id
+                        """,
+                        [
+                            profile_id, public_url, safe_filename, object_key, folder_key or '', blob_id,
+                            object_stat.size, timezone.now(), timezone.now()
+                        ]
+                    )
+                    resume_id = cursor.fetchone()[0]
                 
                 return Response({
                     'success': True,
@@ -237,9 +1072,16 @@ def upload_resume(request):
                     'profile_id': profile_id
                 }, status=status.HTTP_201_CREATED)
                 
+            except StorageQuotaExceeded as e:
+                try:
+                    get_storage().delete_many([object_key])
+                except Exception as remove_error:
+                    print(f'Error removing over-quota upload {object_key}: {remove_error}')
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                )
             except Exception as e:
-
-
                 return Response(
                     {'error': f'Failed to save resume record: {str(e)}'},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -256,6 +1098,7 @@ def upload_resume(request):
 def get_resumes(request, user_id):
     """
     Get all resumes for a user, organized by folder structure.
+    Supports conditional GET: a matching If-None-Match returns 304 without building the tree.
     """
     try:
 
@@ -269,29 +1112,28 @@ def get_resumes(request, user_id):
         
         with connection.cursor() as cursor:
 
-            cursor.execute("SELECT id FROM users WHERE id = %s", [user_id_int])
-            user_row = cursor.fetchone()
+            etag = compute_resume_tree_etag(cursor, user_id_int)
+            if etag_matches(request, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
+
+
+            identity = resolve_identity(request, cursor, user_id_int)
             
-            if not user_row:
+            if not identity:
                 return Response(
                     {'error': f'User with id {user_id_int} does not exist.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
 
-            cursor.execute(
-                "SELECT id FROM profiles WHERE user_id = %s LIMIT 1",
-                [user_id_int]
-            )
-            profile_row = cursor.fetchone()
-            
-            if not profile_row:
+            if not identity.profile_id:
                 return Response(
                     {'resumes': [], 'folders': {}},
-                    status=status.HTTP_200_OK
+                    status=status.HTTP_200_OK,
+                    headers=etag_headers(etag)
                 )
             
-            profile_id = profile_row[0]
+            profile_id = identity.profile_id
             
 
             cursor.execute(
@@ -308,7 +1150,7 @@ def get_resumes(request, user_id):
 
             cursor.execute(
                 """
-                SELECT id, url, filename, created_at, updated_at
+                SELECT id, url, filename, object_key, folder_key, created_at, updated_at
                 FROM resumes
                 WHERE profile_id = %s AND (deleted_at IS NULL)
                 ORDER BY created_at DESC
@@ -392,56 +1234,560 @@ def get_resumes(request, user_id):
                     resumes.append(file_data)
             
 
-            for row in resume_rows:
-                resume_id, url, filename, created_at, updated_at = row
-                
+            for row in resume_rows:
+                resume_id, url, filename, object_key, folder_key, created_at, updated_at = row
+                
+
+                # Rows written before object_key/folder_key existed fall back to the URL until backfilled
+                if object_key is None:
+                    object_key = get_object_name_from_url(url) or ''
+                    folder_key = get_folder_key_from_object_name(object_key)
+                
+                file_data = {
+                    'id': resume_id,
+                    'filename': filename or object_key.rsplit('/', 1)[-1] or 'unknown',
+                    'url': url,
+                    'created_at': created_at.isoformat() if created_at else None,
+                    'updated_at': updated_at.isoformat() if updated_at else None
+                }
+                
+                add_file_to_folder_by_key(folder_key, file_data)
+            
+            return Response({
+                'resumes': resumes,  # Root level files
+                'folders': folders   # Folder structure
+            }, status=status.HTTP_200_OK, headers=etag_headers(etag))
+    
+    except Exception as e:
+        return Response(
+            {'error': f'Internal server error: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+def list_folder_children(request, user_id):
+    """
+    List the direct children of one folder, for on-demand expansion in the UI.
+    Query params: folder_key (empty for root), cursor (from next_cursor), limit (default 50, max 200)
+    Files are keyset-paginated by created_at/id (newest first). Subfolders, each with counts of its
+    direct child folders and files, are returned on the first page only. The first page also fills in
+    the keys of rows backfill_resume_keys has not reached, so they are listed in their folders.
+    """
+    try:
+
+        try:
+            user_id_int = int(user_id)
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid user_id. Must be a valid integer.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        folder_key = (request.query_params.get('folder_key') or '').strip('/')
+        cursor_value = request.query_params.get('cursor')
+        
+
+        try:
+            limit = int(request.query_params.get('limit', FOLDER_LISTING_DEFAULT_LIMIT))
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid limit. Must be a valid integer.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = max(1, min(limit, FOLDER_LISTING_MAX_LIMIT))
+        
+
+        after = None
+        if cursor_value:
+            try:
+                after = decode_listing_cursor(cursor_value)
+            except ValueError as e:
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        with connection.cursor() as cursor:
+
+            identity = resolve_identity(request, cursor, user_id_int)
+            
+            if not identity:
+                return Response(
+                    {'error': f'User with id {user_id_int} does not exist.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+
+            if not identity.profile_id:
+                return Response(
+                    {'folder_key': folder_key, 'folders': [], 'files': [], 'next_cursor': None},
+                    status=status.HTTP_200_OK
+                )
+            
+            profile_id = identity.profile_id
+            
+
+            if folder_key:
+                cursor.execute(
+                    """
+                    SELECT id FROM folders 
+                    WHERE profile_id = %s AND folder_key = %s AND (deleted_at IS NULL)
+                    """,
+                    [profile_id, folder_key]
+                )
+                if not cursor.fetchone():
+                    return Response(
+                        {'error': f'Folder with key "{folder_key}" not found, does not belong to this user, or is deleted.'},
+                        status=status.HTTP_404_NOT_FOUND
+                    )
+            
+
+            folders = []
+            if after is None:
+                fill_missing_resume_keys(cursor, profile_id)
+                
+                # Direct children only: the key extends the parent by exactly one segment
+                prefix = f'{folder_key}/' if folder_key else ''
+                cursor.execute(
+                    """
+                    SELECT
+                        f.id, f.folder_name, f.folder_key, f.created_at, f.updated_at,
+                        (
+                            SELECT count(*) FROM folders c
+                            WHERE c.profile_id = f.profile_id AND (c.deleted_at IS NULL)
+                              AND left(c.folder_key, length(f.folder_key) + 1) = f.folder_key || '/'
+                              AND position('/' in substr(c.folder_key, length(f.folder_key) + 2)) = 0
+                        ) AS folder_count,
+                        (
+                            SELECT count(*) FROM resumes r
+                            WHERE r.profile_id = f.profile_id AND (r.deleted_at IS NULL)
+                              AND r.folder_key = f.folder_key
+                        ) AS file_count
+                    FROM folders f
+                    WHERE f.profile_id = %s AND (f.deleted_at IS NULL)
+                      AND left(f.folder_key, %s) = %s
+                      AND length(f.folder_key) > %s
+                      AND position('/' in substr(f.folder_key, %s)) = 0
+                    ORDER BY f.folder_name, f.id
+                    """,
+                    [profile_id, len(prefix), prefix, len(prefix), len(prefix) + 1]
+                )
+                for folder_id, folder_name, child_key, created_at, updated_at, folder_count, file_count in cursor.fetchall():
+                    folders.append({
+                        'id': folder_id,
+                        'folder_name': folder_name,
+                        'folder_key': child_key,
+                        'folder_count': folder_count,
+                        'file_count': file_count,
+                        'created_at': created_at.isoformat() if created_at else None,
+                        'updated_at': updated_at.isoformat() if updated_at else None
+                    })
+            
+
+            keyset_condition = ''
+            params = [profile_id, folder_key]
+            if after is not None:
+                keyset_condition = 'AND (created_at, id) < (%s, %s)'
+                params.extend(after)
+            params.append(limit + 1)
+            
+            cursor.execute(
+                f"""
+                SELECT id, url, filename, object_key, created_at, updated_at
+                FROM resumes
+                WHERE profile_id = %s AND (deleted_at IS NULL) AND folder_key = %s
+                {keyset_condition}
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s
+                """,
+                params
+            )
+            resume_rows = cursor.fetchall()
+            
+
+            has_more = len(resume_rows) > limit
+            resume_rows = resume_rows[:limit]
+            
+            files = [
+                {
+                    'id': resume_id,
+                    'filename': filename or (object_key or '').rsplit('/', 1)[-1] or 'unknown',
+                    'url': url,
+                    'created_at': created_at.isoformat() if created_at else None,
+                    'updated_at': updated_at.isoformat() if updated_at else None
+                }
+                for resume_id, url, filename, object_key, created_at, updated_at in resume_rows
+            ]
+            
+            next_cursor = None
+            if has_more:
+                last_id, _, _, _, last_created_at, _ = resume_rows[-1]
+                next_cursor = encode_listing_cursor(last_created_at, last_id)
+            
+            return Response({
+                'folder_key': folder_key,
+                'folders': folders,
+                'files': files,
+                'next_cursor': next_cursor
+            }, status=status.HTTP_200_OK)
+    
+    except Exception as e:
+        return Response(
+            {'error': f'Internal server error: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+def search_resumes(request, user_id):
+    """
+    Full-text search over the contents of a user's resumes, best matches first.
+    Query params: q (web search syntax: words, "quoted phrases", -excluded, or), limit (default 20, max 100)
+    Files whose text has not been extracted yet are not found until the indexer reaches them.
+    """
+    try:
+
+        try:
+            user_id_int = int(user_id)
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid user_id. Must be a valid integer.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        search_query = (request.query_params.get('q') or '').strip()
+        if not search_query:
+            return Response(
+                {'error': 'q is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+
+        try:
+            limit = int(request.query_params.get('limit', SEARCH_DEFAULT_LIMIT))
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid limit. Must be a valid integer.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+        
+        with connection.cursor() as cursor:
+
+            identity = resolve_identity(request, cursor, user_id_int)
+            
+            if not identity:
+                return Response(
+                    {'error': f'User with id {user_id_int} does not exist.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+
+            if not identity.profile_id:
+                return Response(
+                    {'query': search_query, 'results': []},
+                    status=status.HTTP_200_OK
+                )
+            
+            profile_id = identity.profile_id
+            
+
+            cursor.execute(
+                """
+                SELECT r.id, r.filename, r.folder_key, r.url, r.created_at, ts_rank_cd(b.content_tsv, query) AS rank
+                FROM resumes r
+                JOIN resume_blobs b ON b.id = r.blob_id
+                CROSS JOIN websearch_to_tsquery(%s::regconfig, %s) AS query
+                WHERE r.profile_id = %s AND (r.deleted_at IS NULL) AND b.content_tsv @@ query
+                ORDER BY rank DESC, r.created_at DESC, r.id DESC
+                LIMIT %s
+                """,
+                [TEXT_SEARCH_CONFIG, search_query, profile_id, limit]
+            )
+            
+            results = [
+                {
+                    'id': resume_id,
+                    'filename': filename,
+                    'folder_key': folder_key or '',
+                    'url': url,
+                    'created_at': created_at.isoformat() if created_at else None,
+                    'rank': round(float(rank), 6)
+                }
+                for resume_id, filename, folder_key, url, created_at, rank in cursor.fetchall()
+            ]
+            
+            return Response({
+                'query': search_query,
+                'results': results
+            }, status=status.HTTP_200_OK)
+    
+    except Exception as e:
+        return Response(
+            {'error': f'Internal server error: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+def export_folder(request, user_id):
+    """
+    Download a folder, its subfolders and their resumes as one streamed ZIP archive.
+    Query params: folder_key (empty exports every resume of the user)
+    Archive paths use the folders' display names. Rows whose folder_key has not been backfilled yet
+    are placed by their object name, like get_resumes does. Nothing is buffered to disk, and memory
+    stays bounded by the prefetch window however large the folder or its files are.
+    """
+    try:
+
+        try:
+            user_id_int = int(user_id)
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid user_id. Must be a valid integer.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        folder_key = (request.query_params.get('folder_key') or '').strip('/')
+        subtree_prefix = f'{folder_key}/' if folder_key else ''
+        
+        with connection.cursor() as cursor:
+
+            identity = resolve_identity(request, cursor, user_id_int)
+            
+            if not identity:
+                return Response(
+                    {'error': f'User with id {user_id_int} does not exist.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+
+            if not identity.profile_id:
+                return Response(
+                    {'error': f'Profile not found for user_id {user_id_int}.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            profile_id = identity.profile_id
+            
+
+            # Display names of the folder and everything below it, to build archive paths
+            cursor.execute(
+                """
+                SELECT folder_key, folder_name FROM folders 
+                WHERE profile_id = %s AND (deleted_at IS NULL)
+                  AND (folder_key = %s OR left(folder_key, %s) = %s)
+                """,
+                [profile_id, folder_key, len(subtree_prefix), subtree_prefix]
+            )
+            folder_names = dict(cursor.fetchall())
+            
+            if folder_key and folder_key not in folder_names:
+                return Response(
+                    {'error': f'Folder with key "{folder_key}" not found, does not belong to this user, or is deleted.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+
+            cursor.execute(
+                """
+                SELECT id, url, filename, object_key, folder_key, updated_at FROM resumes 
+                WHERE profile_id = %s AND (deleted_at IS NULL)
+                  AND (folder_key IS NULL OR folder_key = %s OR left(folder_key, %s) = %s)
+                ORDER BY folder_key, filename, id
+                """,
+                [profile_id, folder_key, len(subtree_prefix), subtree_prefix]
+            )
+            resume_rows = cursor.fetchall()
+        
 
+        entries = []
+        taken = set()
+        for resume_id, url, filename, object_key, resume_folder_key, updated_at in resume_rows:
+            object_name = object_key or get_object_name_from_url(url or '')
+            if not object_name:
+                continue
+            
+            if resume_folder_key is None:
+                resume_folder_key = get_folder_key_from_object_name(object_name)
+                if resume_folder_key != folder_key and not resume_folder_key.startswith(subtree_prefix):
+                    continue
+            
+            relative_key = (resume_folder_key or '')[len(subtree_prefix):] if resume_folder_key != folder_key else ''
+            path_names = []
+            if relative_key:
+                segments = relative_key.split('/')
+                for depth in range(1, len(segments) + 1):
+                    key = subtree_prefix + '/'.join(segments[:depth])
+                    path_names.append(folder_names.get(key, segments[depth - 1]))
+            
+            arcname = next_free_filename('/'.join(path_names + [filename or object_name.rsplit('/', 1)[-1]]), taken)
+            taken.add(arcname)
+            entries.append((arcname, object_name, updated_at))
+        
+        archive_name = folder_names.get(folder_key) or 'resumes'
+        response = StreamingHttpResponse(stream_zip_archive(entries), content_type='application/zip')
+        response['Content-Disposition'] = content_disposition_header(True, f'{archive_name}.zip')
+        response['Cache-Control'] = 'no-store'
+        return response
+    
+    except Exception as e:
+        return Response(
+            {'error': f'Internal server error: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
 
-                parsed_url = urlparse(url)
-                path_parts = [p for p in parsed_url.path.strip('/').split('/') if p]
-                
-                file_data = {
-                    'id': resume_id,
-                    'filename': filename or 'unknown',
-                    'url': url,
-                    'created_at': created_at.isoformat() if created_at else None,
-                    'updated_at': updated_at.isoformat() if updated_at else None
-                }
-                
-                if len(path_parts) > 2:
 
+@api_view(['GET'])
+def download_resume(request, user_id, resume_id):
+    """
+    Download a stored resume after checking that it belongs to the user.
+    Default: redirect to a short-lived presigned GET URL, so the bucket does not need to be public.
+    ?mode=proxy: stream the object through Django in chunks, with Range, ETag and Last-Modified support.
+    """
+    try:
+
+        try:
+            user_id_int = int(user_id)
+            resume_id_int = int(resume_id)
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid user_id or resume_id. Must be valid integers.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        mode = request.query_params.get('mode', 'redirect')
+        if mode not in ('redirect', 'proxy'):
+            return Response(
+                {'error': 'Invalid mode. Allowed modes: redirect, proxy'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        with connection.cursor() as cursor:
 
+            identity = resolve_identity(request, cursor, user_id_int)
+            
+            if not identity:
+                return Response(
+                    {'error': f'User with id {user_id_int} does not exist.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
 
-                    remaining_parts = path_parts[2:]
-                    
+            if not identity.profile_id:
+                return Response(
+                    {'error': f'Profile not found for user_id {user_id_int}.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
 
-                    if remaining_parts and remaining_parts[0] == 'resumes':
-                        remaining_parts = remaining_parts[1:]
-                    
-                    if len(remaining_parts) > 1:
+            cursor.execute(
+                """
+                SELECT url, filename, object_key FROM resumes 
+                WHERE id = %s AND profile_id = %s AND (deleted_at IS NULL)
+                """,
+                [resume_id_int, identity.profile_id]
+            )
+            resume_row = cursor.fetchone()
+            
+            if not resume_row:
+                return Response(
+                    {'error': f'Resume with id {resume_id_int} not found, does not belong to this user, or is deleted.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            url, filename, object_name = resume_row
+        
 
-                        folder_key_path = '/'.join(remaining_parts[:-1])  # e.g., "DevOps/Pipelines"
-                        file_name = remaining_parts[-1]
-                        file_data['filename'] = filename or file_name
+        if not object_name:
+            object_name = get_object_name_from_url(url)
+        if not object_name:
+            return Response(
+                {'error': 'Invalid file URL format'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        filename = filename or object_name.rsplit('/', 1)[-1]
+        
 
-                        add_file_to_folder_by_key(folder_key_path, file_data)
-                    else:
+        storage = get_storage()
+        if mode == 'redirect':
+            try:
+                download_url = storage.presign_get(object_name, filename)
+            except PresignNotSupported:
+                # Backends without presigned URLs are served through Django instead
+                download_url = None
+            if download_url:
+                response = HttpResponseRedirect(download_url)
+                response['Cache-Control'] = 'no-store'
+                return response
+        
 
-                        file_data['filename'] = filename or remaining_parts[0]
-                        resumes.append(file_data)
-                elif len(path_parts) == 2:
+        object_stat = storage.stat(object_name)
+        if not object_stat:
+            return Response(
+                {'error': 'File not found in storage.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        etag = f'"{object_stat.etag}"'
+        last_modified = object_stat.last_modified.timestamp() if object_stat.last_modified else None
+        cache_headers = {
+            'ETag': etag,
+            'Accept-Ranges': 'bytes',
+            'Cache-Control': 'private, max-age=3600',
+        }
+        if last_modified is not None:
+            cache_headers['Last-Modified'] = http_date(last_modified)
+        
 
-                    file_data['filename'] = filename or path_parts[1]
-                    resumes.append(file_data)
-                else:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        if request.META.get('HTTP_IF_NONE_MATCH'):
+            not_modified = etag_matches(request, etag)
+        else:
+            if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+            not_modified = bool(if_modified_since and last_modified and int(last_modified) <= if_modified_since)
+        
+        if not_modified:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            for header, value in cache_headers.items():
+                response[header] = value
+            return response
+        
 
-                    file_data['filename'] = filename or 'unknown'
-                    resumes.append(file_data)
-            
-            return Response({
-                'resumes': resumes,  # Root level files
-                'folders': folders   # Folder structure
-            }, status=status.HTTP_200_OK)
+        range_header = request.META.get('HTTP_RANGE')
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if if_range and if_range.strip() != etag:
+            range_header = None
+        
+        try:
+            byte_range = parse_range_header(range_header, object_stat.size)
+        except ValueError:
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = f'bytes */{object_stat.size}'
+            return response
+        
+        if byte_range:
+            start, end = byte_range
+            object_chunks = storage.get_stream(
+                object_name, offset=start, length=end - start + 1, chunk_size=DOWNLOAD_CHUNK_SIZE
+            )
+        else:
+            start, end = 0, object_stat.size - 1
+            object_chunks = storage.get_stream(object_name, chunk_size=DOWNLOAD_CHUNK_SIZE)
+        
+        response = StreamingHttpResponse(
+            object_chunks,
+            status=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+            content_type=object_stat.content_type or 'application/octet-stream'
+        )
+        for header, value in cache_headers.items():
+            response[header] = value
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+        if byte_range:
+            response['Content-Range'] = f'bytes {start}-{end}/{object_stat.size}'
+        return response
     
     except Exception as e:
         return Response(
@@ -451,9 +1797,11 @@ def get_resumes(request, user_id):
 
 
 @api_view(['POST'])
+@idempotent('create_folder')
 def create_folder(request):
     """
-    Create a new folder in MinIO for a user.
+    Create a new folder for a user.
+    Folders only exist in the database; a unique index on live (profile_id, folder_key) rows detects collisions.
     Expects: user_id, folder_name, parent_folder (optional)
     """
     try:
@@ -491,109 +1839,53 @@ def create_folder(request):
         
         with connection.cursor() as cursor:
 
-            cursor.execute("SELECT id, username FROM users WHERE id = %s", [user_id_int])
-            user_row = cursor.fetchone()
+            identity = resolve_identity(request, cursor, user_id_int)
             
-            if not user_row:
+            if not identity:
                 return Response(
                     {'error': f'User with id {user_id_int} does not exist.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            user_id_db, username = user_row
+            username = identity.username
             
 
             base_path = f"{username}/resumes"
             if parent_folder:
                 folder_path = f"{base_path}/{parent_folder}/{folder_name}"
-                object_name = f"{base_path}/{parent_folder}/{folder_name}/.keep"  # Create a placeholder file
                 folder_key = f"{parent_folder}/{folder_name}"
             else:
                 folder_path = f"{base_path}/{folder_name}"
-                object_name = f"{base_path}/{folder_name}/.keep"  # Create a placeholder file
                 folder_key = folder_name
             
 
-            cursor.execute(
-                "SELECT id FROM profiles WHERE user_id = %s LIMIT 1",
-                [user_id_int]
-            )
-            profile_row = cursor.fetchone()
-            
-            if not profile_row:
+            if not identity.profile_id:
                 return Response(
                     {'error': f'Profile not found for user_id {user_id_int}.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            profile_id = profile_row[0]
+            profile_id = identity.profile_id
             
 
             cursor.execute(
                 """
-                SELECT id FROM folders 
-                WHERE profile_id = %s AND folder_key = %s
+                INSERT INTO folders (profile_id, folder_name, folder_key, created_at, updated_at)
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (profile_id, folder_key) WHERE deleted_at IS NULL DO NOTHING
+                RETURNING id
                 """,
-                [profile_id, folder_key]
+                [profile_id, folder_name, folder_key, timezone.now(), timezone.now()]
             )
-            existing_folder = cursor.fetchone()
+            folder_row = cursor.fetchone()
             
-            if existing_folder:
+            if not folder_row:
                 return Response(
                     {'error': f'Folder "{folder_name}" already exists at this location'},
                     status=status.HTTP_409_CONFLICT
                 )
             
-
-            try:
-                minio_client = get_minio_client()
-                
-
-                prefix_to_check = f"{base_path}/{parent_folder}/{folder_name}/" if parent_folder else f"{base_path}/{folder_name}/"
-                found_objects = list(minio_client.list_objects(MINIO_BUCKET, prefix=prefix_to_check, recursive=False))
-                
-                if found_objects:
-                    return Response(
-                        {'error': f'Folder "{folder_name}" already exists at this location'},
-                        status=status.HTTP_409_CONFLICT
-                    )
-            except Exception as e:
-
-
-                print(f"Error checking folder existence in MinIO: {e}")
-            
-
-            try:
-                placeholder_content = b""  # Empty file
-                upload_file(
-                    MINIO_BUCKET,
-                    object_name,
-                    placeholder_content,
-                    'text/plain'
-                )
-            except Exception as e:
-                return Response(
-                    {'error': f'Failed to create folder in storage: {str(e)}'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-            
-
-
-            try:
-                cursor.execute(
-                    """
-                    INSERT INTO folders (profile_id, folder_name, folder_key, created_at, updated_at)
-                    VALUES (%s, %s, %s, %s, %s)
-                    RETURNING id
-                    """,
-                    [profile_id, folder_name, folder_key, timezone.now(), timezone.now()]
-                )
-                folder_id = cursor.fetchone()[0]
-            except Exception as e:
-
-
-                print(f'Warning: Failed to save folder record to database: {str(e)}')
-                folder_id = None
+            folder_id = folder_row[0]
             
             return Response({
                 'success': True,
@@ -668,39 +1960,26 @@ def rename_file(request):
         
 
 
-        file_extension = os.path.splitext(new_filename)[1]
-        base_name = os.path.splitext(new_filename)[0]
-
-        base_name = re.sub(r'[^a-zA-Z0-9_-]', '_', base_name)
-        if not base_name:
-            base_name = 'file'
-        new_filename = base_name + file_extension if file_extension else base_name
+        new_filename = sanitize_filename(new_filename)
         
         with connection.cursor() as cursor:
 
-            cursor.execute("SELECT id FROM users WHERE id = %s", [user_id_int])
-            user_row = cursor.fetchone()
+            identity = resolve_identity(request, cursor, user_id_int)
             
-            if not user_row:
+            if not identity:
                 return Response(
                     {'error': f'User with id {user_id_int} does not exist.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
 
-            cursor.execute(
-                "SELECT id FROM profiles WHERE user_id = %s LIMIT 1",
-                [user_id_int]
-            )
-            profile_row = cursor.fetchone()
-            
-            if not profile_row:
+            if not identity.profile_id:
                 return Response(
                     {'error': f'Profile not found for user_id {user_id_int}.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            profile_id = profile_row[0]
+            profile_id = identity.profile_id
             
 
             cursor.execute(
@@ -720,28 +1999,17 @@ def rename_file(request):
             
 
 
-            final_filename = new_filename
-            counter = 0
-            
-            while True:
-                cursor.execute(
-                    """
-                    SELECT id FROM resumes 
-                    WHERE profile_id = %s AND filename = %s AND id != %s
-                    """,
-                    [profile_id, final_filename, resume_id_int]
-                )
-                existing_resume = cursor.fetchone()
-                
-                if not existing_resume:
-
-                    break
-                
-
-                counter += 1
-                base_name_without_ext = os.path.splitext(new_filename)[0]
-                file_ext = os.path.splitext(new_filename)[1]
-                final_filename = f"{base_name_without_ext}({counter}){file_ext}"
+            # Only names starting with the base name can collide with it or its (n) suffixes
+            base_name = os.path.splitext(new_filename)[0]
+            cursor.execute(
+                """
+                SELECT filename FROM resumes 
+                WHERE profile_id = %s AND id != %s AND left(filename, %s) = %s
+                """,
+                [profile_id, resume_id_int, len(base_name), base_name]
+            )
+            taken = {row[0] for row in cursor.fetchall()}
+            final_filename = next_free_filename(new_filename, taken)
             
 
             cursor.execute(
@@ -780,7 +2048,7 @@ def delete_file(request):
     """
     Soft delete a file by updating deleted_at in the resumes table.
     Expects: user_id, resume_id
-    No change to the bucket path - just marks as deleted in database.
+    No change to the bucket path - just marks as deleted in database and releases the row's blob reference.
     """
     try:
         user_id = request.data.get('user_id')
@@ -818,29 +2086,22 @@ def delete_file(request):
         
         with connection.cursor() as cursor:
 
-            cursor.execute("SELECT id FROM users WHERE id = %s", [user_id_int])
-            user_row = cursor.fetchone()
+            identity = resolve_identity(request, cursor, user_id_int)
             
-            if not user_row:
+            if not identity:
                 return Response(
                     {'error': f'User with id {user_id_int} does not exist.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
 
-            cursor.execute(
-                "SELECT id FROM profiles WHERE user_id = %s LIMIT 1",
-                [user_id_int]
-            )
-            profile_row = cursor.fetchone()
-            
-            if not profile_row:
+            if not identity.profile_id:
                 return Response(
                     {'error': f'Profile not found for user_id {user_id_int}.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            profile_id = profile_row[0]
+            profile_id = identity.profile_id
             
 
             cursor.execute(
@@ -875,16 +2136,22 @@ def delete_file(request):
                 )
             
 
-            cursor.execute(
-                """
-                UPDATE resumes 
-                SET deleted_at = %s, updated_at = %s
-                WHERE id = %s AND profile_id = %s
-                RETURNING id, filename
-                """,
-                [timezone.now(), timezone.now(), resume_id_int, profile_id]
-            )
-            updated_row = cursor.fetchone()
+            with transaction.atomic():
+                cursor.execute(
+                    """
+                    UPDATE resumes 
+                    SET deleted_at = %s, updated_at = %s
+                    WHERE id = %s AND profile_id = %s AND (deleted_at IS NULL)
+                    RETURNING id, filename, blob_id, size
+                    """,
+                    [timezone.now(), timezone.now(), resume_id_int, profile_id]
+                )
+                updated_row = cursor.fetchone()
+                
+                if updated_row:
+                    # Usage counter before blob rows, the same lock order as uploads and copies
+                    change_storage_usage(cursor, profile_id, -(updated_row[3] or 0), -1)
+                    release_blob_references(cursor, [updated_row[2]])
             
             if not updated_row:
                 return Response(
@@ -907,10 +2174,11 @@ def delete_file(request):
 
 
 @api_view(['POST'])
+@idempotent('copy_file')
 def copy_file(request):
     """
-    Copy a file to a new location (same as upload resume flow).
-    Downloads the original file from MinIO and uploads it again with timestamp.
+    Copy a file to a new location.
+    The copy references the same stored content as the original, so nothing is copied in storage.
     Expects: user_id, resume_id, folder_path (optional)
     """
     try:
@@ -948,161 +2216,96 @@ def copy_file(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        with connection.cursor() as cursor:
-
-            cursor.execute("SELECT id, username FROM users WHERE id = %s", [user_id_int])
-            user_row = cursor.fetchone()
-            
-            if not user_row:
-                return Response(
-                    {'error': f'User with id {user_id_int} does not exist.'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-            
-            user_id_db, username = user_row
-            
-
-            cursor.execute(
-                "SELECT id FROM profiles WHERE user_id = %s LIMIT 1",
-                [user_id_int]
-            )
-            profile_row = cursor.fetchone()
-            
-            if not profile_row:
-                return Response(
-                    {'error': f'Profile not found for user_id {user_id_int}.'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-            
-            profile_id = profile_row[0]
-            
-
-            folder_key = convert_folder_path_to_key(cursor, profile_id, folder_path)
-            if folder_path and folder_key is None:
-                return Response(
-                    {'error': f'Folder with path "{folder_path}" does not exist. Please create the folder first.'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-            
-
-            if folder_key:
-
-                cursor.execute(
-                    """
-                    SELECT id FROM folders 
-                    WHERE profile_id = %s AND folder_key = %s AND (deleted_at IS NULL)
-                    """,
-                    [profile_id, folder_key]
-                )
-                folder_exists = cursor.fetchone()
-                
-                if not folder_exists:
-                    return Response(
-                        {'error': f'Folder with key "{folder_key}" does not exist. Please create the folder first.'},
-                        status=status.HTTP_404_NOT_FOUND
-                    )
-            
-
-            cursor.execute(
-                """
-                SELECT id, url, filename FROM resumes 
-                WHERE id = %s AND profile_id = %s AND (deleted_at IS NULL)
-                """,
-                [resume_id_int, profile_id]
-            )
-            resume_row = cursor.fetchone()
-            
-            if not resume_row:
-                return Response(
-                    {'error': f'Resume with id {resume_id_int} not found, does not belong to this user, or is deleted.'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-            
-            resume_id_orig, original_url, original_filename = resume_row
-            
-
-
-            parsed_url = urlparse(original_url)
-            path_parts = [p for p in parsed_url.path.strip('/').split('/') if p]
-            
-
-            if len(path_parts) > 0:
-
-                object_name = '/'.join(path_parts[1:]) if len(path_parts) > 1 else path_parts[0]
-            else:
-                return Response(
-                    {'error': 'Invalid file URL format'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-
-            try:
-                file_data = download_file(MINIO_BUCKET, object_name)
-            except Exception as e:
-                return Response(
-                    {'error': f'Failed to download file from storage: {str(e)}'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-            
+        with connection.cursor() as cursor:
 
-            file_extension = os.path.splitext(original_filename)[1].lower()
+            identity = resolve_identity(request, cursor, user_id_int)
             
-
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            safe_filename = original_filename.replace(' ', '_')
+            if not identity:
+                return Response(
+                    {'error': f'User with id {user_id_int} does not exist.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
             
-            if folder_key:
-                new_object_name = f"{username}/resumes/{folder_key}/{timestamp}_{safe_filename}"
-            else:
 
-                new_object_name = f"{username}/resumes/{timestamp}_{safe_filename}"
+            if not identity.profile_id:
+                return Response(
+                    {'error': f'Profile not found for user_id {user_id_int}.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
             
-
-            content_type_map = {
-                '.pdf': 'application/pdf',
-                '.doc': 'application/msword',
-                '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            }
-            content_type = content_type_map.get(file_extension, 'application/octet-stream')
+            profile_id = identity.profile_id
             
 
-            try:
-                upload_file(MINIO_BUCKET, new_object_name, file_data, content_type)
-            except Exception as e:
+            folder_key = convert_folder_path_to_key(cursor, profile_id, folder_path)
+            if folder_path and folder_key is None:
                 return Response(
-                    {'error': f'Failed to upload copied file to storage: {str(e)}'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                    {'error': f'Folder with path "{folder_path}" does not exist. Please create the folder first.'},
+                    status=status.HTTP_404_NOT_FOUND
                 )
             
 
-            public_url = get_public_url(MINIO_BUCKET, new_object_name)
+            quota = get_storage_quota(cursor, user_id_int)
             
-
             try:
-                cursor.execute(
-                    """
-                    INSERT INTO resumes (profile_id, url, filename, created_at, updated_at)
-                    VALUES (%s, %s, %s, %s, %s)
-                    RETURNING id
-                    """,
-                    [profile_id, public_url, safe_filename, timezone.now(), timezone.now()]
+                with transaction.atomic():
+                    # Copies share the original's blob: no bytes are copied, only a row and a reference are added
+                    fill_missing_resume_keys(cursor, profile_id, [resume_id_int])
+                    adopt_legacy_blobs(cursor, [resume_id_int])
+                    cursor.execute(
+                        """
+                        SELECT id, url, filename, object_key, blob_id, size FROM resumes 
+                        WHERE id = %s AND profile_id = %s AND (deleted_at IS NULL)
+                        """,
+                        [resume_id_int, profile_id]
+                    )
+                    resume_row = cursor.fetchone()
+                    
+                    if not resume_row:
+                        return Response(
+                            {'error': f'Resume with id {resume_id_int} not found, does not belong to this user, or is deleted.'},
+                            status=status.HTTP_404_NOT_FOUND
+                        )
+                    
+                    resume_id_orig, original_url, original_filename, object_name, blob_id, size = resume_row
+                    
+                    if not object_name or not blob_id:
+                        return Response(
+                            {'error': 'Invalid file URL format'},
+                            status=status.HTTP_400_BAD_REQUEST
+                        )
+                    
+                    safe_filename = original_filename.replace(' ', '_')
+                    
+                    change_storage_usage(cursor, profile_id, size, 1, quota)
+                    add_blob_references(cursor, [blob_id])
+                    cursor.execute(
+                        """
+                        INSERT INTO resumes (profile_id, url, filename, object_key, folder_key, blob_id, size, created_at, updated_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        RETURNING id
+                        """,
+                        [profile_id, original_url, safe_filename, object_name, folder_key or '', blob_id, size, timezone.now(), timezone.now()]
+                    )
+                    new_resume_id = cursor.fetchone()[0]
+            except StorageQuotaExceeded as e:
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
                 )
-                new_resume_id = cursor.fetchone()[0]
-                
-                return Response({
-                    'success': True,
-                    'message': 'File copied successfully',
-                    'resume_id': new_resume_id,
-                    'url': public_url,
-                    'filename': safe_filename,
-                    'profile_id': profile_id
-                }, status=status.HTTP_201_CREATED)
-                
             except Exception as e:
                 return Response(
                     {'error': f'Failed to save copied file record: {str(e)}'},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
+            
+            return Response({
+                'success': True,
+                'message': 'File copied successfully',
+                'resume_id': new_resume_id,
+                'url': original_url,
+                'filename': safe_filename,
+                'profile_id': profile_id
+            }, status=status.HTTP_201_CREATED)
     
     except Exception as e:
         return Response(
@@ -1115,7 +2318,7 @@ def copy_file(request):
 def move_file(request):
     """
     Move a file to a new location.
-    First copies the file (same as copy_file), then deletes the original (same as delete_file).
+    Adds a row for the new location sharing the original's stored content, then soft deletes the original.
     Expects: user_id, resume_id, folder_path (optional)
     """
     try:
@@ -1157,31 +2360,22 @@ def move_file(request):
 
         with connection.cursor() as cursor:
 
-            cursor.execute("SELECT id, username FROM users WHERE id = %s", [user_id_int])
-            user_row = cursor.fetchone()
+            identity = resolve_identity(request, cursor, user_id_int)
             
-            if not user_row:
+            if not identity:
                 return Response(
                     {'error': f'User with id {user_id_int} does not exist.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            user_id_db, username = user_row
-            
 
-            cursor.execute(
-                "SELECT id FROM profiles WHERE user_id = %s LIMIT 1",
-                [user_id_int]
-            )
-            profile_row = cursor.fetchone()
-            
-            if not profile_row:
+            if not identity.profile_id:
                 return Response(
                     {'error': f'Profile not found for user_id {user_id_int}.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            profile_id = profile_row[0]
+            profile_id = identity.profile_id
             
 
             folder_key = convert_folder_path_to_key(cursor, profile_id, folder_path)
@@ -1192,146 +2386,389 @@ def move_file(request):
                 )
             
 
-            if folder_key:
-
-                cursor.execute(
-                    """
-                    SELECT id FROM folders 
-                    WHERE profile_id = %s AND folder_key = %s AND (deleted_at IS NULL)
-                    """,
-                    [profile_id, folder_key]
-                )
-                folder_exists = cursor.fetchone()
-                
-                if not folder_exists:
-                    return Response(
-                        {'error': f'Folder with key "{folder_key}" does not exist. Please create the folder first.'},
-                        status=status.HTTP_404_NOT_FOUND
+            try:
+                with transaction.atomic():
+                    fill_missing_resume_keys(cursor, profile_id, [resume_id_int])
+                    adopt_legacy_blobs(cursor, [resume_id_int])
+                    cursor.execute(
+                        """
+                        SELECT id, url, filename, object_key, blob_id, size FROM resumes 
+                        WHERE id = %s AND profile_id = %s AND (deleted_at IS NULL)
+                        FOR UPDATE
+                        """,
+                        [resume_id_int, profile_id]
                     )
-            
-
-            cursor.execute(
-                """
-                SELECT id, url, filename FROM resumes 
-                WHERE id = %s AND profile_id = %s AND (deleted_at IS NULL)
-                """,
-                [resume_id_int, profile_id]
-            )
-            resume_row = cursor.fetchone()
-            
-            if not resume_row:
+                    resume_row = cursor.fetchone()
+                    
+                    if not resume_row:
+                        return Response(
+                            {'error': f'Resume with id {resume_id_int} not found, does not belong to this user, or is deleted.'},
+                            status=status.HTTP_404_NOT_FOUND
+                        )
+                    
+                    resume_id_orig, original_url, original_filename, object_name, blob_id, size = resume_row
+                    
+                    if not object_name or not blob_id:
+                        return Response(
+                            {'error': 'Invalid file URL format'},
+                            status=status.HTTP_400_BAD_REQUEST
+                        )
+                    
+                    safe_filename = original_filename.replace(' ', '_')
+                    
+                    # The new row takes over the original's blob reference and size, so neither count changes
+                    cursor.execute(
+                        """
+                        INSERT INTO resumes (profile_id, url, filename, object_key, folder_key, blob_id, size, created_at, updated_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        RETURNING id
+                        """,
+                        [profile_id, original_url, safe_filename, object_name, folder_key or '', blob_id, size, timezone.now(), timezone.now()]
+                    )
+                    new_resume_id = cursor.fetchone()[0]
+                    
+                    cursor.execute(
+                        """
+                        UPDATE resumes 
+                        SET deleted_at = %s, updated_at = %s
+                        WHERE id = %s AND profile_id = %s
+                        """,
+                        [timezone.now(), timezone.now(), resume_id_int, profile_id]
+                    )
+            except Exception as e:
                 return Response(
-                    {'error': f'Resume with id {resume_id_int} not found, does not belong to this user, or is deleted.'},
-                    status=status.HTTP_404_NOT_FOUND
+                    {'error': f'Failed to save moved file record: {str(e)}'},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
             
-            resume_id_orig, original_url, original_filename = resume_row
-            
+            return Response({
+                'success': True,
+                'message': 'File moved successfully',
+                'new_resume_id': new_resume_id,
+                'old_resume_id': resume_id_int,
+                'url': original_url,
+                'filename': safe_filename,
+                'profile_id': profile_id
+            }, status=status.HTTP_200_OK)
+    
+    except Exception as e:
+        return Response(
+            {'error': f'Internal server error: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
 
-            parsed_url = urlparse(original_url)
-            path_parts = [p for p in parsed_url.path.strip('/').split('/') if p]
-            
 
-            if len(path_parts) > 0:
-                object_name = '/'.join(path_parts[1:]) if len(path_parts) > 1 else path_parts[0]
-            else:
-                return Response(
-                    {'error': 'Invalid file URL format'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
+def sanitize_filename(filename):
+    """Restrict the base name to letters, numbers, hyphens and underscores, keeping the extension"""
+    file_extension = os.path.splitext(filename)[1]
+    base_name = re.sub(r'[^a-zA-Z0-9_-]', '_', os.path.splitext(filename)[0])
+    if not base_name:
+        base_name = 'file'
+    return base_name + file_extension if file_extension else base_name
 
-            try:
-                file_data = download_file(MINIO_BUCKET, object_name)
-            except Exception as e:
-                return Response(
-                    {'error': f'Failed to download file from storage: {str(e)}'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-            
 
-            file_extension = os.path.splitext(original_filename)[1].lower()
-            
+def next_free_filename(filename, taken):
+    """Append (1), (2), ... to the base name until it is not in taken"""
+    final_filename = filename
+    counter = 0
+    while final_filename in taken:
+        counter += 1
+        base_name, file_ext = os.path.splitext(filename)
+        final_filename = f"{base_name}({counter}){file_ext}"
+    return final_filename
 
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            safe_filename = original_filename.replace(' ', '_')
-            
-            if folder_key:
-                new_object_name = f"{username}/resumes/{folder_key}/{timestamp}_{safe_filename}"
-            else:
-                new_object_name = f"{username}/resumes/{timestamp}_{safe_filename}"
-            
 
-            content_type_map = {
-                '.pdf': 'application/pdf',
-                '.doc': 'application/msword',
-                '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            }
-            content_type = content_type_map.get(file_extension, 'application/octet-stream')
-            
+@api_view(['POST'])
+def bulk_file_operation(request):
+    """
+    Apply one operation to many resumes in a single request.
+    Expects: user_id, resume_ids (list), operation (move, copy, delete or rename),
+    folder_path (move/copy, optional), rename_pattern (rename; supports {name} and {n})
+    Ownership is checked in one query and all row changes are committed in one transaction;
+    copies and moves share the originals' blobs, so they do no storage I/O. Returns a result for every requested id.
+    With no storage calls left to overlap, the bounded worker pool for storage operations was dropped.
+    """
+    try:
+        user_id = request.data.get('user_id')
+        resume_ids = request.data.get('resume_ids')
+        operation = request.data.get('operation')
+        folder_path = request.data.get('folder_path', '')
+        rename_pattern = (request.data.get('rename_pattern') or '').strip()
+        
+        if not user_id:
+            return Response(
+                {'error': 'user_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if operation not in BULK_OPERATIONS:
+            return Response(
+                {'error': f'operation must be one of: {", ".join(BULK_OPERATIONS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not isinstance(resume_ids, list) or not resume_ids:
+            return Response(
+                {'error': 'resume_ids must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if len(resume_ids) > MAX_BULK_ITEMS:
+            return Response(
+                {'error': f'At most {MAX_BULK_ITEMS} resume_ids are allowed per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if operation == 'rename' and not rename_pattern:
+            return Response(
+                {'error': 'rename_pattern is required for rename'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
 
-            try:
-                upload_file(MINIO_BUCKET, new_object_name, file_data, content_type)
-            except Exception as e:
-                return Response(
-                    {'error': f'Failed to upload moved file to storage: {str(e)}'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-            
+        try:
+            user_id_int = int(user_id)
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid user_id. Must be a valid integer.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
 
-            public_url = get_public_url(MINIO_BUCKET, new_object_name)
-            
+        try:
+            # Keep the caller's order (it numbers {n} in rename patterns) but drop repeats
+            resume_id_ints = list(dict.fromkeys(int(resume_id) for resume_id in resume_ids))
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid resume_ids. Every id must be a valid integer.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        with connection.cursor() as cursor:
 
-            try:
-                cursor.execute(
-                    """
-                    INSERT INTO resumes (profile_id, url, filename, created_at, updated_at)
-                    VALUES (%s, %s, %s, %s, %s)
-                    RETURNING id
-                    """,
-                    [profile_id, public_url, safe_filename, timezone.now(), timezone.now()]
-                )
-                new_resume_id = cursor.fetchone()[0]
-            except Exception as e:
+            identity = resolve_identity(request, cursor, user_id_int)
+            
+            if not identity:
                 return Response(
-                    {'error': f'Failed to save moved file record: {str(e)}'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                    {'error': f'User with id {user_id_int} does not exist.'},
+                    status=status.HTTP_404_NOT_FOUND
                 )
             
 
-            try:
-                cursor.execute(
-                    """
-                    UPDATE resumes 
-                    SET deleted_at = %s, updated_at = %s
-                    WHERE id = %s AND profile_id = %s
-                    RETURNING id, filename
-                    """,
-                    [timezone.now(), timezone.now(), resume_id_int, profile_id]
+            if not identity.profile_id:
+                return Response(
+                    {'error': f'Profile not found for user_id {user_id_int}.'},
+                    status=status.HTTP_404_NOT_FOUND
                 )
-                deleted_row = cursor.fetchone()
-                
-                if not deleted_row:
-
+            
+            profile_id = identity.profile_id
+            
 
+            folder_key = ''
+            if operation in ('move', 'copy'):
+                folder_key = convert_folder_path_to_key(cursor, profile_id, folder_path)
+                if folder_path and folder_key is None:
                     return Response(
-                        {'error': 'File was copied but failed to delete original. Please contact support.'},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                        {'error': f'Folder with path "{folder_path}" does not exist. Please create the folder first.'},
+                        status=status.HTTP_404_NOT_FOUND
                     )
-            except Exception as e:
-                return Response(
-                    {'error': f'File was copied but failed to delete original: {str(e)}'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
+            
+
+            # One ownership check for the whole selection
+            cursor.execute(
+                """
+                SELECT id, url, filename, object_key FROM resumes 
+                WHERE id = ANY(%s) AND profile_id = %s AND (deleted_at IS NULL)
+                """,
+                [resume_id_ints, profile_id]
+            )
+            owned = {row[0]: row for row in cursor.fetchall()}
+            
+            results = {}
+            for resume_id_int in resume_id_ints:
+                if resume_id_int not in owned:
+                    results[resume_id_int] = {
+                        'resume_id': resume_id_int,
+                        'success': False,
+                        'error': 'Resume not found, does not belong to this user, or is deleted.'
+                    }
+            
+            targets = [resume_id_int for resume_id_int in resume_id_ints if resume_id_int in owned]
+            now = timezone.now()
+            
+            if operation in ('move', 'copy'):
+
+                if targets:
+                    quota = get_storage_quota(cursor, user_id_int) if operation == 'copy' else None
+                    try:
+                        with transaction.atomic():
+                            # New rows share the originals' blobs, so no bytes are copied in storage
+                            fill_missing_resume_keys(cursor, profile_id, targets)
+                            adopt_legacy_blobs(cursor, targets)
+                            cursor.execute(
+                                """
+                                SELECT id, url, filename, object_key, blob_id, size FROM resumes 
+                                WHERE id = ANY(%s) AND profile_id = %s AND (deleted_at IS NULL)
+                                FOR UPDATE
+                                """,
+                                [targets, profile_id]
+                            )
+                            sources = {row[0]: row for row in cursor.fetchall()}
+                        
+                            copied = []
+                            for resume_id_int in targets:
+                                source = sources.get(resume_id_int)
+                                if not source or not source[4]:
+                                    results[resume_id_int] = {
+                                        'resume_id': resume_id_int,
+                                        'success': False,
+                                        'error': 'Resume is deleted or has no stored object.'
+                                    }
+                                    continue
+                                copied.append(source)
+                        
+                            if copied:
+                                # Ids are drawn up front so every new row can be matched to its source
+                                cursor.execute(
+                                    "SELECT nextval(pg_get_serial_sequence('resumes', 'id')) FROM generate_series(1, %s)",
+                                    [len(copied)]
+                                )
+                                new_ids = [row[0] for row in cursor.fetchall()]
+                            
+                                cursor.execute(
+                                    """
+                                    INSERT INTO resumes (id, profile_id, url, filename, object_key, folder_key, blob_id, size, created_at, updated_at)
+                                    SELECT v.id, %s, v.url, v.filename, v.object_key, %s, v.blob_id, v.size, %s, %s
+                                    FROM unnest(%s::bigint[], %s::text[], %s::text[], %s::text[], %s::bigint[], %s::bigint[])
+                                        AS v(id, url, filename, object_key, blob_id, size)
+                                    """,
+                                    [
+                                        profile_id, folder_key or '', now, now,
+                                        new_ids,
+                                        [url for _, url, _, _, _, _ in copied],
+                                        [filename.replace(' ', '_') for _, _, filename, _, _, _ in copied],
+                                        [object_key for _, _, _, object_key, _, _ in copied],
+                                        [blob_id for _, _, _, _, blob_id, _ in copied],
+                                        [size for _, _, _, _, _, size in copied],
+                                    ]
+                                )
+                            
+                                if operation == 'copy':
+                                    change_storage_usage(
+                                        cursor, profile_id, sum(size or 0 for _, _, _, _, _, size in copied), len(copied), quota
+                                    )
+                                    add_blob_references(cursor, [blob_id for _, _, _, _, blob_id, _ in copied])
+                                else:
+                                    # Each new row takes over its original's blob reference
+                                    cursor.execute(
+                                        """
+                                        UPDATE resumes 
+                                        SET deleted_at = %s, updated_at = %s
+                                        WHERE id = ANY(%s) AND profile_id = %s
+                                        """,
+                                        [now, now, [source[0] for source in copied], profile_id]
+                                    )
+                    
+                    except StorageQuotaExceeded as e:
+                        return Response(
+                            {'error': str(e)},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                        )
+                    
+                    for (resume_id_int, url, filename, _, _, _), new_resume_id in zip(copied, new_ids if copied else []):
+                        results[resume_id_int] = {
+                            'resume_id': resume_id_int,
+                            'success': True,
+                            'new_resume_id': new_resume_id,
+                            'url': url,
+                            'filename': filename.replace(' ', '_')
+                        }
+            
+            elif operation == 'delete':
+
+                if targets:
+                    with transaction.atomic():
+                        cursor.execute(
+                            """
+                            UPDATE resumes 
+                            SET deleted_at = %s, updated_at = %s
+                            WHERE id = ANY(%s) AND profile_id = %s AND (deleted_at IS NULL)
+                            RETURNING id, blob_id, size
+                            """,
+                            [now, now, targets, profile_id]
+                        )
+                        deleted_rows = cursor.fetchall()
+                        deleted_ids = {row[0] for row in deleted_rows}
+                        change_storage_usage(
+                            cursor, profile_id, -sum(row[2] or 0 for row in deleted_rows), -len(deleted_rows)
+                        )
+                        release_blob_references(cursor, [row[1] for row in deleted_rows])
+                    
+                    for resume_id_int in targets:
+                        if resume_id_int in deleted_ids:
+                            results[resume_id_int] = {
+                                'resume_id': resume_id_int,
+                                'success': True,
+                                'filename': owned[resume_id_int][2]
+                            }
+                        else:
+                            results[resume_id_int] = {
+                                'resume_id': resume_id_int,
+                                'success': False,
+                                'error': 'File is already deleted.'
+                            }
+            
+            else:
+
+                if targets:
+                    with transaction.atomic():
+                        # Same uniqueness rule as rename_file, checked once against every other file of the profile
+                        cursor.execute(
+                            """
+                            SELECT filename FROM resumes 
+                            WHERE profile_id = %s AND NOT (id = ANY(%s))
+                            """,
+                            [profile_id, targets]
+                        )
+                        taken = {row[0] for row in cursor.fetchall()}
+                        
+                        new_filenames = []
+                        for position, resume_id_int in enumerate(targets, start=1):
+                            original_filename = owned[resume_id_int][2] or ''
+                            original_base, original_ext = os.path.splitext(original_filename)
+                            renamed = rename_pattern.replace('{name}', original_base).replace('{n}', str(position))
+                            if not os.path.splitext(renamed)[1]:
+                                renamed += original_ext
+                            final_filename = next_free_filename(sanitize_filename(renamed), taken)
+                            taken.add(final_filename)
+                            new_filenames.append(final_filename)
+                        
+                        cursor.execute(
+                            """
+                            UPDATE resumes r
+                            SET filename = v.filename, updated_at = %s
+                            FROM unnest(%s::bigint[], %s::text[]) AS v(id, filename)
+                            WHERE r.id = v.id AND r.profile_id = %s
+                            """,
+                            [now, targets, new_filenames, profile_id]
+                        )
+                    
+                    for resume_id_int, final_filename in zip(targets, new_filenames):
+                        results[resume_id_int] = {
+                            'resume_id': resume_id_int,
+                            'success': True,
+                            'filename': final_filename
+                        }
+            
+            ordered_results = [results[resume_id_int] for resume_id_int in resume_id_ints]
+            succeeded = sum(1 for result in ordered_results if result['success'])
             
             return Response({
-                'success': True,
-                'message': 'File moved successfully',
-                'new_resume_id': new_resume_id,
-                'old_resume_id': resume_id_int,
-                'url': public_url,
-                'filename': safe_filename,
-                'profile_id': profile_id
+                'success': succeeded == len(ordered_results),
+                'operation': operation,
+                'succeeded': succeeded,
+                'failed': len(ordered_results) - succeeded,
+                'results': ordered_results
             }, status=status.HTTP_200_OK)
     
     except Exception as e:
@@ -1397,29 +2834,22 @@ def rename_folder(request):
         
         with connection.cursor() as cursor:
 
-            cursor.execute("SELECT id FROM users WHERE id = %s", [user_id_int])
-            user_row = cursor.fetchone()
+            identity = resolve_identity(request, cursor, user_id_int)
             
-            if not user_row:
+            if not identity:
                 return Response(
                     {'error': f'User with id {user_id_int} does not exist.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
 
-            cursor.execute(
-                "SELECT id FROM profiles WHERE user_id = %s LIMIT 1",
-                [user_id_int]
-            )
-            profile_row = cursor.fetchone()
-            
-            if not profile_row:
+            if not identity.profile_id:
                 return Response(
                     {'error': f'Profile not found for user_id {user_id_int}.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            profile_id = profile_row[0]
+            profile_id = identity.profile_id
             
 
             cursor.execute(
@@ -1475,8 +2905,11 @@ def rename_folder(request):
 @api_view(['POST'])
 def delete_folder(request):
     """
-    Soft delete a folder by updating deleted_at in the folders table.
+    Recursively soft delete a folder, its subfolders and the resumes inside them.
     Expects: user_id, folder_key
+    Rows are updated in one set-based statement; objects no other row can reference are removed
+    afterwards by the background purger, so the request does not wait on the bucket.
+    Keys of rows backfill_resume_keys has not reached are filled in first, so they are deleted too.
     """
     try:
         user_id = request.data.get('user_id')
@@ -1505,29 +2938,22 @@ def delete_folder(request):
         
         with connection.cursor() as cursor:
 
-            cursor.execute("SELECT id FROM users WHERE id = %s", [user_id_int])
-            user_row = cursor.fetchone()
+            identity = resolve_identity(request, cursor, user_id_int)
             
-            if not user_row:
+            if not identity:
                 return Response(
                     {'error': f'User with id {user_id_int} does not exist.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
 
-            cursor.execute(
-                "SELECT id FROM profiles WHERE user_id = %s LIMIT 1",
-                [user_id_int]
-            )
-            profile_row = cursor.fetchone()
-            
-            if not profile_row:
+            if not identity.profile_id:
                 return Response(
                     {'error': f'Profile not found for user_id {user_id_int}.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            profile_id = profile_row[0]
+            profile_id = identity.profile_id
             
 
             cursor.execute(
@@ -1546,31 +2972,70 @@ def delete_folder(request):
                 )
             
             folder_id, folder_name = folder_row
+            now = timezone.now()
+            subtree_prefix = f'{folder_key}/'
             
 
-            cursor.execute(
-                """
-                UPDATE folders 
-                SET deleted_at = %s, updated_at = %s
-                WHERE id = %s AND profile_id = %s
-                RETURNING id, folder_name, folder_key
-                """,
-                [timezone.now(), timezone.now(), folder_id, profile_id]
-            )
-            updated_row = cursor.fetchone()
-            
-            if not updated_row:
-                return Response(
-                    {'error': 'Failed to delete folder'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            # The folder and everything below it: exact key or exact prefix (LIKE would treat "_" as a wildcard)
+            with transaction.atomic():
+                fill_missing_resume_keys(cursor, profile_id)
+                cursor.execute(
+                    """
+                    WITH deleted_folders AS (
+                        UPDATE folders 
+                        SET deleted_at = %(now)s, updated_at = %(now)s
+                        WHERE profile_id = %(profile_id)s AND (deleted_at IS NULL)
+                          AND (folder_key = %(folder_key)s OR left(folder_key, %(prefix_length)s) = %(prefix)s)
+                        RETURNING folder_key
+                    ),
+                    deleted_resumes AS (
+                        UPDATE resumes 
+                        SET deleted_at = %(now)s, updated_at = %(now)s
+                        WHERE profile_id = %(profile_id)s AND (deleted_at IS NULL)
+                          AND (folder_key = %(folder_key)s OR left(folder_key, %(prefix_length)s) = %(prefix)s)
+                        RETURNING object_key, url, blob_id, size
+                    )
+                    SELECT
+                        (SELECT coalesce(json_agg(folder_key), '[]'::json) FROM deleted_folders),
+                        (SELECT coalesce(json_agg(json_build_array(object_key, url, blob_id, size)), '[]'::json) FROM deleted_resumes)
+                    """,
+                    {
+                        'now': now,
+                        'profile_id': profile_id,
+                        'folder_key': folder_key,
+                        'prefix': subtree_prefix,
+                        'prefix_length': len(subtree_prefix),
+                    }
+                )
+                deleted_folder_keys, deleted_resumes = cursor.fetchone()
+                
+                change_storage_usage(
+                    cursor, profile_id, -sum(size or 0 for _, _, _, size in deleted_resumes), -len(deleted_resumes)
+                )
+                # Shared blobs are only released here; storage_gc removes them once unreferenced.
+                # Objects of rows stored before deduplication belong to that row alone and are purged now.
+                release_blob_references(cursor, [blob_id for _, _, blob_id, _ in deleted_resumes if blob_id])
+                object_names = [
+                    object_key or get_object_name_from_url(url or '')
+                    for object_key, url, blob_id, _ in deleted_resumes
+                    if not blob_id
+                ]
+                # Folders created before they became database-only have a .keep placeholder object
+                object_names.extend(
+                    f"{identity.username}/resumes/{deleted_folder_key}/.keep"
+                    for deleted_folder_key in deleted_folder_keys
                 )
+                
+                transaction.on_commit(lambda: enqueue_purge(object_names))
             
             return Response({
                 'success': True,
                 'message': 'Folder deleted successfully',
-                'folder_id': updated_row[0],
-                'folder_name': updated_row[1],
-                'folder_key': updated_row[2]
+                'folder_id': folder_id,
+                'folder_name': folder_name,
+                'folder_key': folder_key,
+                'deleted_folders': len(deleted_folder_keys),
+                'deleted_files': len(deleted_resumes)
             }, status=status.HTTP_200_OK)
     
     except Exception as e:
@@ -1578,4 +3043,3 @@ def delete_folder(request):
             {'error': f'Internal server error: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
-
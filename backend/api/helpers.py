@@ -3,22 +3,13 @@ import json
 import requests
 
 
-def get_user_details_data(user_id_int):
-    """
-    Helper function to get user details data.
-    Returns the user details dictionary or None if user doesn't exist.
-    """
-    with connection.cursor() as cursor:
-
-        cursor.execute("SELECT id FROM users WHERE id = %s", [user_id_int])
-        user_row = cursor.fetchone()
-        
-        if not user_row:
-            return None
-
-
-        sql_query = """
-            WITH user_profile AS (
+# Per-section SQL fragments for the user details payload, keyed by the JSON field they produce.
+# Every fragment is correlated on target_user.id, so callers only pay for the sections they select.
+USER_DETAILS_SECTIONS = {
+    'userProfile': """
+        (
+            SELECT row_to_json(up)
+            FROM (
                 SELECT 
                     u.id AS user_id,
                     u.username,
@@ -71,200 +62,291 @@ def get_user_details_data(user_id_int):
                     ) AS links
                 FROM users u
                 LEFT JOIN profiles p ON p.user_id = u.id
-                WHERE u.id = %s
-            )
-
-            SELECT jsonb_build_object(
-                'userProfile', (SELECT row_to_json(up) FROM user_profile up),
-
-                'projects', (
-                    SELECT COALESCE(jsonb_agg(
-                        jsonb_build_object(
-                            'id', pr.id,
-                            'key', pr.key,
-                            'name', pr.name,
-                            'description', pr.description,
-                            'start_date', pr.start_date,
-                            'end_date', pr.end_date,
-                            'sorting_order', pr.sorting_order,
-                            'created_at', pr.created_at,
-                            'updated_at', pr.updated_at,
-                            'category', c.name,
-                            'status', s.key,
-                            -- Project Settings
-                            'settings', (
-                                SELECT row_to_json(ps)
-                                FROM project_settings ps
-                                WHERE ps.project_id = pr.id
-                                  AND ps.user_id = %s
-                            ),
-                            -- Project Links
-                            'links', (
-                                SELECT COALESCE(jsonb_agg(
-                                    jsonb_build_object(
-                                        'title', l.name,
-                                        'url', l.url,
-                                        'type', lt.key
-                                    )
-                                ), '[]'::jsonb)
-                                FROM links l
-                                JOIN link_types lt ON l.link_type_id = lt.id
-                                WHERE l.linkable_id = pr.id
-                                  AND l.linkable_type = 'App\\Models\\Project'
-                                  AND l.deleted_at IS NULL
-                            ),
-                            -- Project Tags (Technologies only)
-                            'technologies', (
-                                SELECT COALESCE(
-                                    to_jsonb(array_agg(DISTINCT value)), '[]'::jsonb
-                                )
-                                FROM tags t,
-                                     LATERAL jsonb_array_elements_text(t.name::jsonb) AS value
-                                WHERE t.project_id = pr.id
-                                  AND t.type = 'technology'
-                                  AND t.user_id = %s
+                WHERE u.id = target_user.id
+            ) up
+        )
+    """,
+
+    'projects': """
+        (
+            SELECT COALESCE(jsonb_agg(
+                jsonb_build_object(
+                    'id', pr.id,
+                    'key', pr.key,
+                    'name', pr.name,
+                    'description', pr.description,
+                    'start_date', pr.start_date,
+                    'end_date', pr.end_date,
+                    'sorting_order', pr.sorting_order,
+                    'created_at', pr.created_at,
+                    'updated_at', pr.updated_at,
+                    'category', c.name,
+                    'status', s.key,
+                    -- Project Settings
+                    'settings', (
+                        SELECT row_to_json(ps)
+                        FROM project_settings ps
+                        WHERE ps.project_id = pr.id
+                          AND ps.user_id = target_user.id
+                    ),
+                    -- Project Links
+                    'links', (
+                        SELECT COALESCE(jsonb_agg(
+                            jsonb_build_object(
+                                'title', l.name,
+                                'url', l.url,
+                                'type', lt.key
                             )
+                        ), '[]'::jsonb)
+                        FROM links l
+                        JOIN link_types lt ON l.link_type_id = lt.id
+                        WHERE l.linkable_id = pr.id
+                          AND l.linkable_type = 'App\\Models\\Project'
+                          AND l.deleted_at IS NULL
+                    ),
+                    -- Project Tags (Technologies only)
+                    'technologies', (
+                        SELECT COALESCE(
+                            to_jsonb(array_agg(DISTINCT value)), '[]'::jsonb
                         )
-                        ORDER BY pr.sorting_order ASC, pr.created_at DESC
-                    ), '[]'::jsonb)
-                    FROM projects pr
-                    LEFT JOIN categories c ON pr.category_id = c.id
-                    LEFT JOIN status s ON pr.status_id = s.id
-                    WHERE pr.user_id = %s
-                      AND pr.is_public = TRUE
-                      AND pr.hide_on_website = FALSE
-                      AND pr.deleted_at IS NULL
-                ),
-
-                'certifications', (
-                    SELECT COALESCE(jsonb_agg(
-                        jsonb_build_object(
-                            'id', c.id,
-                            'name', c.name,
-                            'description', c.description,
-                            'start_date', c.start_date,
-                            'end_date', c.end_date,
-                            'institute_name', c.institute_name
-                        )
-                    ), '[]'::jsonb)
-                    FROM certifications c
-                    JOIN profiles p ON c.profile_id = p.id
-                    WHERE p.user_id = %s
-                      AND c.deleted_at IS NULL
-                ),
-
-                'achievements', (
-                    SELECT COALESCE(jsonb_agg(
-                        jsonb_build_object(
-                            'id', a.id,
-                            'description', a.description
-                        )
-                    ), '[]'::jsonb)
-                    FROM achievements a
-                    JOIN profiles p ON a.profile_id = p.id
-                    WHERE p.user_id = %s
-                      AND a.deleted_at IS NULL
-                ),
-
-                'experiences', (
-                    SELECT COALESCE(jsonb_agg(
-                        jsonb_build_object(
-                            'id', e.id,
-                            'company_name', e.company_name,
-                            'role', e.role,
-                            'start_date', e.start_date,
-                            'end_date', e.end_date,
-                            'description', e.description,
-                            'skills', e.skills,
-                            'location', e.location
-                        ) ORDER BY (e.end_date IS NULL) DESC, e.end_date DESC
-                    ), '[]'::jsonb)
-                    FROM experiences e
-                    JOIN profiles p ON e.profile_id = p.id
-                    WHERE p.user_id = %s
-                      AND e.deleted_at IS NULL
-                ),
-
-                'publications', (
-                    SELECT COALESCE(jsonb_agg(
-                        jsonb_build_object(
-                            'id', pub.id,
-                            'paper_name', pub.paper_name,
-                            'conference_name', pub.conference_name,
-                            'description', pub.description,
-                            'published_date', pub.published_date,
-                            'paper_link', pub.paper_link
-                        )
-                    ), '[]'::jsonb)
-                    FROM publications pub
-                    JOIN profiles p ON pub.profile_id = p.id
-                    WHERE p.user_id = %s
-                      AND pub.deleted_at IS NULL
-                ),
-
-                'skills', (
-                    SELECT COALESCE(jsonb_agg(
-                        jsonb_build_object(
-                            'id', s.id,
-                            'name', s.name,
-                            'category_id', s.category_id,
-                            'category', jsonb_build_object(
-                                'id', c.id,
-                                'name', c.name,
-                                'user_id', c.user_id
-                            ),
-                            'proficiency_level', s.proficiency_level,
-                            'description', s.description
-                        )
-                    ), '[]'::jsonb)
-                    FROM skills s
-                    JOIN profiles p ON s.profile_id = p.id
-                    LEFT JOIN skill_categories c ON s.category_id = c.id
-                    WHERE p.user_id = %s
-                ),
-
-                'education', (
-                    SELECT COALESCE(jsonb_agg(
-                        jsonb_build_object(
-                            'id', e.id,
-                            'university_name', e.university_name,
-                            'degree', e.degree,
-                            'from_date', e.from_date,
-                            'end_date', e.end_date,
-                            'location', e.location,
-                            'cgpa', e.cgpa
-                        ) ORDER BY (e.end_date IS NULL) DESC, e.end_date DESC
-                    ), '[]'::jsonb)
-                    FROM education e
-                    JOIN profiles p ON e.profile_id = p.id
-                    WHERE p.user_id = %s
-                      AND e.deleted_at IS NULL
-                ),
-
-                'categories', (
-                    SELECT COALESCE(jsonb_agg(row_to_json(cats)), '[]'::jsonb)
-                    FROM (
-                        SELECT id, name, key
-                        FROM categories
-                        WHERE user_id = %s OR user_id IS NULL
-                    ) cats
-                ),
-
-                'technologies', (
-                    SELECT COALESCE(
-                        to_jsonb(array_agg(DISTINCT value)), '[]'::jsonb
+                        FROM tags t,
+                             LATERAL jsonb_array_elements_text(t.name::jsonb) AS value
+                        WHERE t.project_id = pr.id
+                          AND t.type = 'technology'
+                          AND t.user_id = target_user.id
                     )
-                    FROM tags t,
-                         LATERAL jsonb_array_elements_text(t.name::jsonb) AS value
-                    WHERE t.type = 'technology'
-                      AND t.user_id = %s
-                      AND t.project_id IS NOT NULL
                 )
-            ) AS result;
-        """
+                ORDER BY pr.sorting_order ASC, pr.created_at DESC
+            ), '[]'::jsonb)
+            FROM projects pr
+            LEFT JOIN categories c ON pr.category_id = c.id
+            LEFT JOIN status s ON pr.status_id = s.id
+            WHERE pr.user_id = target_user.id
+              AND pr.is_public = TRUE
+              AND pr.hide_on_website = FALSE
+              AND pr.deleted_at IS NULL
+        )
+    """,
+
+    'certifications': """
+        (
+            SELECT COALESCE(jsonb_agg(
+                jsonb_build_object(
+                    'id', c.id,
+                    'name', c.name,
+                    'description', c.description,
+                    'start_date', c.start_date,
+                    'end_date', c.end_date,
+                    'institute_name', c.institute_name
+                )
+            ), '[]'::jsonb)
+            FROM certifications c
+            JOIN profiles p ON c.profile_id = p.id
+            WHERE p.user_id = target_user.id
+              AND c.deleted_at IS NULL
+        )
+    """,
+
+    'achievements': """
+        (
+            SELECT COALESCE(jsonb_agg(
+                jsonb_build_object(
+                    'id', a.id,
+                    'description', a.description
+                )
+            ), '[]'::jsonb)
+            FROM achievements a
+            JOIN profiles p ON a.profile_id = p.id
+            WHERE p.user_id = target_user.id
+              AND a.deleted_at IS NULL
+        )
+    """,
+
+    'experiences': """
+        (
+            SELECT COALESCE(jsonb_agg(
+                jsonb_build_object(
+                    'id', e.id,
+                    'company_name', e.company_name,
+                    'role', e.role,
+                    'start_date', e.start_date,
+                    'end_date', e.end_date,
+                    'description', e.description,
+                    'skills', e.skills,
+                    'location', e.location
+                ) ORDER BY (e.end_date IS NULL) DESC, e.end_date DESC
+            ), '[]'::jsonb)
+            FROM experiences e
+            JOIN profiles p ON e.profile_id = p.id
+            WHERE p.user_id = target_user.id
+              AND e.deleted_at IS NULL
+        )
+    """,
+
+    'publications': """
+        (
+            SELECT COALESCE(jsonb_agg(
+                jsonb_build_object(
+                    'id', pub.id,
+                    'paper_name', pub.paper_name,
+                    'conference_name', pub.conference_name,
+                    'description', pub.description,
+                    'published_date', pub.published_date,
+                    'paper_link', pub.paper_link
+                )
+            ), '[]'::jsonb)
+            FROM publications pub
+            JOIN profiles p ON pub.profile_id = p.id
+            WHERE p.user_id = target_user.id
+              AND pub.deleted_at IS NULL
+        )
+    """,
+
+    'skills': """
+        (
+            SELECT COALESCE(jsonb_agg(
+                jsonb_build_object(
+                    'id', s.id,
+                    'name', s.name,
+                    'category_id', s.category_id,
+                    'category', jsonb_build_object(
+                        'id', c.id,
+                        'name', c.name,
+                        'user_id', c.user_id
+                    ),
+                    'proficiency_level', s.proficiency_level,
+                    'description', s.description
+                )
+            ), '[]'::jsonb)
+            FROM skills s
+            JOIN profiles p ON s.profile_id = p.id
+            LEFT JOIN skill_categories c ON s.category_id = c.id
+            WHERE p.user_id = target_user.id
+        )
+    """,
+
+    'education': """
+        (
+            SELECT COALESCE(jsonb_agg(
+                jsonb_build_object(
+                    'id', e.id,
+                    'university_name', e.university_name,
+                    'degree', e.degree,
+                    'from_date', e.from_date,
+                    'end_date', e.end_date,
+                    'location', e.location,
+                    'cgpa', e.cgpa
+                ) ORDER BY (e.end_date IS NULL) DESC, e.end_date DESC
+            ), '[]'::jsonb)
+            FROM education e
+            JOIN profiles p ON e.profile_id = p.id
+            WHERE p.user_id = target_user.id
+              AND e.deleted_at IS NULL
+        )
+    """,
+
+    'categories': """
+        (
+            SELECT COALESCE(jsonb_agg(row_to_json(cats)), '[]'::jsonb)
+            FROM (
+                SELECT id, name, key
+                FROM categories
+                WHERE user_id = target_user.id OR user_id IS NULL
+            ) cats
+        )
+    """,
+
+    'technologies': """
+        (
+            SELECT COALESCE(
+                to_jsonb(array_agg(DISTINCT value)), '[]'::jsonb
+            )
+            FROM tags t,
+                 LATERAL jsonb_array_elements_text(t.name::jsonb) AS value
+            WHERE t.type = 'technology'
+              AND t.user_id = target_user.id
+              AND t.project_id IS NOT NULL
+        )
+    """,
+}
+
+USER_DETAILS_FIELDS = tuple(USER_DETAILS_SECTIONS.keys())
+
+# The resume generation pipeline only reads these sections (see prepare_resume_sections)
+RESUME_GENERATION_FIELDS = ('userProfile', 'experiences', 'projects')
+
+
+def parse_user_details_fields(raw_fields):
+    """
+    Parse a comma-separated fields selector (e.g. "userProfile,projects").
+    Returns a tuple of field names in canonical order, or None to select every section.
+    Raises ValueError for unknown field names.
+    """
+    if not raw_fields:
+        return None
+
+    requested = {field.strip() for field in raw_fields.split(',') if field.strip()}
+    if not requested:
+        return None
+
+    unknown = requested - set(USER_DETAILS_FIELDS)
+    if unknown:
+        raise ValueError(
+            f'Unknown fields: {", ".join(sorted(unknown))}. Allowed fields: {", ".join(USER_DETAILS_FIELDS)}'
+        )
+
+    return tuple(field for field in USER_DETAILS_FIELDS if field in requested)
 
 
-        cursor.execute(sql_query, [user_id_int] * 12)
+def build_user_details_sections_sql(fields=None):
+    """Join the selected section fragments into jsonb_build_object arguments"""
+    selected = fields or USER_DETAILS_FIELDS
+    return ',\n'.join(
+        f"'{field}', {USER_DETAILS_SECTIONS[field]}" for field in selected
+    )
+
+
+def build_user_details_query(fields=None, as_text=False):
+    """
+    Build the user details SQL from the per-section fragments.
+    The query takes a single parameter (the user id) and returns no row if the user doesn't exist.
+    With as_text the JSON is returned as text, so the driver does not decode it into Python objects.
+    """
+    return f"""
+        SELECT jsonb_build_object(
+            {build_user_details_sections_sql(fields)}
+        ){'::text' if as_text else ''} AS result
+        FROM users target_user
+        WHERE target_user.id = %s
+    """
+
+
+def build_user_details_batch_query(fields=None, as_text=False):
+    """
+    Set-based variant of build_user_details_query.
+    Takes a single array parameter of user ids and returns one (user_id, result) row per existing user.
+    """
+    return f"""
+        SELECT
+            target_user.id,
+            jsonb_build_object(
+                {build_user_details_sections_sql(fields)}
+            ){'::text' if as_text else ''} AS result
+        FROM users target_user
+        WHERE target_user.id = ANY(%s)
+        ORDER BY target_user.id
+    """
+
+
+def get_user_details_data(user_id_int, fields=None):
+    """
+    Helper function to get user details data.
+    Only the sections listed in fields are computed (all of them when fields is None).
+    Returns the user details dictionary or None if user doesn't exist.
+    """
+    with connection.cursor() as cursor:
+
+        cursor.execute(build_user_details_query(fields), [user_id_int])
         
         row = cursor.fetchone()
         
@@ -281,6 +363,53 @@ def get_user_details_data(user_id_int):
         return result_data
 
 
+def get_user_details_json(user_id_int, fields=None):
+    """
+    Fast path of get_user_details_data for HTTP responses.
+    Returns the JSON document exactly as Postgres rendered it (a str), or None if user doesn't exist.
+    """
+    with connection.cursor() as cursor:
+
+        cursor.execute(build_user_details_query(fields, as_text=True), [user_id_int])
+
+        row = cursor.fetchone()
+
+        if not row or not row[0]:
+            return None
+
+        return row[0]
+
+
+def iter_user_details_batch(user_ids, fields=None, chunk_size=250, fetch_size=50, as_text=False):
+    """
+    Counterpart to get_user_details_data for many users.
+    Runs one grouped query per chunk of ids and yields (user_id, details) in the order of user_ids,
+    with details set to None for users that don't exist. Only one chunk is held in memory at a time.
+    With as_text each details value is the raw JSON text rendered by Postgres.
+    """
+    query = build_user_details_batch_query(fields, as_text=as_text)
+
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        found = {}
+
+        with connection.cursor() as cursor:
+            cursor.execute(query, [list(chunk)])
+
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+
+                for user_id, result_data in rows:
+                    if isinstance(result_data, str) and not as_text:
+                        result_data = json.loads(result_data)
+                    found[user_id] = result_data
+
+        for user_id in chunk:
+            yield user_id, found.pop(user_id, None)
+
+
 def prepare_resume_sections(user_details, prompt, job_description):
     """
     Prepare user details into sections for sequential processing.
@@ -0,0 +1,139 @@
+import functools
+import hashlib
+import json
+import os
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# How long a stored result is replayed for a repeated Idempotency-Key
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', '86400'))
+# A claim whose request never finished (e.g. the worker died) can be retried after this long
+IDEMPOTENCY_LOCK_TIMEOUT_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_TIMEOUT_SECONDS', '120'))
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
+def request_fingerprint(request):
+    """SHA-256 of the request's fields and uploaded files' names and sizes"""
+    fields = {
+        key: request.data.getlist(key) if hasattr(request.data, 'getlist') else request.data[key]
+        for key in request.data
+        if key not in request.FILES
+    }
+    files = {
+        key: [(uploaded.name, uploaded.size) for uploaded in request.FILES.getlist(key)]
+        for key in request.FILES
+    }
+    payload = json.dumps({'fields': fields, 'files': files}, sort_keys=True, cls=JSONEncoder)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def claim_idempotency_key(cursor, scope, key, fingerprint):
+    """
+    Claim (scope, key) for this request. Expired results and stale unfinished claims are taken over.
+    Returns True if claimed, otherwise False (a result or an in-flight claim exists).
+    """
+    now = timezone.now()
+    cursor.execute(
+        """
+        INSERT INTO idempotency_keys (scope, idempotency_key, request_hash, created_at, expires_at)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (scope, idempotency_key) DO UPDATE
+        SET request_hash = EXCLUDED.request_hash, status_code = NULL, response_body = NULL,
+            created_at = EXCLUDED.created_at, expires_at = EXCLUDED.expires_at
+        WHERE idempotency_keys.expires_at < EXCLUDED.created_at
+           OR (idempotency_keys.status_code IS NULL AND idempotency_keys.created_at < %s)
+        RETURNING id
+        """,
+        [
+            scope, key, fingerprint, now, now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+            now - timedelta(seconds=IDEMPOTENCY_LOCK_TIMEOUT_SECONDS),
+        ]
+    )
+    return cursor.fetchone() is not None
+
+
+def idempotent(endpoint):
+    """
+    Make a POST view safe to retry with an Idempotency-Key header.
+    The first request with a key runs the view and stores its response for IDEMPOTENCY_TTL_SECONDS;
+    repeats return the stored response without running the view again. Server errors are not
+    stored, so they can be retried. Keys are scoped per endpoint and user_id.
+    Apply below @api_view.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = request.headers.get('Idempotency-Key')
+            if not key:
+                return view(request, *args, **kwargs)
+
+            if len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+                return Response(
+                    {'error': f'Idempotency-Key must be at most {MAX_IDEMPOTENCY_KEY_LENGTH} characters'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            scope = f"{endpoint}:{request.data.get('user_id')}"
+            fingerprint = request_fingerprint(request)
+
+            with connection.cursor() as cursor:
+                if not claim_idempotency_key(cursor, scope, key, fingerprint):
+                    cursor.execute(
+                        """
+                        SELECT request_hash, status_code, response_body FROM idempotency_keys
+                        WHERE scope = %s AND idempotency_key = %s
+                        """,
+                        [scope, key]
+                    )
+                    row = cursor.fetchone()
+                    if row:
+                        stored_fingerprint, status_code, response_body = row
+
+                        if stored_fingerprint != fingerprint:
+                            return Response(
+                                {'error': 'Idempotency-Key was already used for a different request'},
+                                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                            )
+
+                        if status_code is None:
+                            return Response(
+                                {'error': 'A request with this Idempotency-Key is still being processed'},
+                                status=status.HTTP_409_CONFLICT
+                            )
+
+                        if isinstance(response_body, str):
+                            response_body = json.loads(response_body)
+                        return Response(response_body, status=status_code, headers={'Idempotent-Replayed': 'true'})
+
+                    # The row vanished between the two statements; run the view without protection
+                    return view(request, *args, **kwargs)
+
+            response = None
+            try:
+                response = view(request, *args, **kwargs)
+            finally:
+                with connection.cursor() as cursor:
+                    if isinstance(response, Response) and response.status_code < 500:
+                        cursor.execute(
+                            """
+                            UPDATE idempotency_keys SET status_code = %s, response_body = %s
+                            WHERE scope = %s AND idempotency_key = %s
+                            """,
+                            [response.status_code, json.dumps(response.data, cls=JSONEncoder), scope, key]
+                        )
+                    else:
+                        cursor.execute(
+                            "DELETE FROM idempotency_keys WHERE scope = %s AND idempotency_key = %s",
+                            [scope, key]
+                        )
+            return response
+
+        return wrapper
+    return decorator
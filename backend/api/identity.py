@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+
+UserIdentity = namedtuple('UserIdentity', ['user_id', 'username', 'profile_id'])
+
+# Optional per-worker cache; 0 disables it so every request reads fresh identity rows.
+# Code that renames a user or creates/removes their profile must call invalidate_identity;
+# other workers pick the change up once their entry expires, so keep the TTL short.
+IDENTITY_CACHE_TTL = float(os.getenv('IDENTITY_CACHE_TTL', '0'))
+
+_identity_cache = {}
+_identity_cache_lock = threading.Lock()
+
+
+def _get_request_memo(request):
+    """Per-request memo dict, stored on the underlying HttpRequest so DRF wrappers share it"""
+    http_request = getattr(request, '_request', request)
+    memo = getattr(http_request, '_identity_memo', None)
+    if memo is None:
+        memo = {}
+        http_request._identity_memo = memo
+    return memo
+
+
+def _get_cached_identity(user_id_int):
+    if IDENTITY_CACHE_TTL <= 0:
+        return None
+
+    with _identity_cache_lock:
+        entry = _identity_cache.get(user_id_int)
+        if not entry:
+            return None
+
+        identity, expires_at = entry
+        if expires_at < time.monotonic():
+            del _identity_cache[user_id_int]
+            return None
+
+        return identity
+
+
+def _set_cached_identity(identity):
+    if IDENTITY_CACHE_TTL <= 0:
+        return
+
+    with _identity_cache_lock:
+        _identity_cache[identity.user_id] = (identity, time.monotonic() + IDENTITY_CACHE_TTL)
+
+
+def invalidate_identity(user_id_int):
+    """Drop a user's identity from this worker's cache after their username or profile changes"""
+    with _identity_cache_lock:
+        _identity_cache.pop(user_id_int, None)
+
+
+def resolve_identity(request, cursor, user_id_int):
+    """
+    Resolve user id, username and profile id in a single joined query.
+    The result is memoized for the request (and, if IDENTITY_CACHE_TTL is set, per worker).
+    Returns a UserIdentity, with profile_id None if the user has no profile,
+    or None if the user doesn't exist.
+    """
+    memo = _get_request_memo(request) if request is not None else {}
+    if user_id_int in memo:
+        return memo[user_id_int]
+
+    identity = _get_cached_identity(user_id_int)
+
+    if identity is None:
+        cursor.execute(
+            """
+            SELECT u.id, u.username, p.id
+            FROM users u
+            LEFT JOIN LATERAL (
+                SELECT id FROM profiles WHERE user_id = u.id LIMIT 1
+            ) p ON TRUE
+            WHERE u.id = %s
+            """,
+            [user_id_int]
+        )
+        row = cursor.fetchone()
+        identity = UserIdentity(*row) if row else None
+
+        # Only complete identities are shared across requests, so a profile created
+        # after a miss is picked up immediately
+        if identity and identity.profile_id:
+            _set_cached_identity(identity)
+
+    memo[user_id_int] = identity
+    return identity
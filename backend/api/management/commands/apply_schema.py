@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api.schema import SCHEMA_CHANGES, concurrent_index_name, drop_invalid_index
+
+
+class Command(BaseCommand):
+    help = 'Apply the idempotent schema changes owned by this service (columns, tables, indexes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only',
+            type=str,
+            default='',
+            help='Comma-separated names of the changes to apply (defaults to all)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Print the statements without executing them'
+        )
+
+    def handle(self, *args, **options):
+        only = {name.strip() for name in options['only'].split(',') if name.strip()}
+        changes = [(name, statements) for name, statements in SCHEMA_CHANGES if not only or name in only]
+
+        unknown = only - {name for name, _ in SCHEMA_CHANGES}
+        if unknown:
+            self.stdout.write(
+                self.style.ERROR(f'Unknown schema changes: {", ".join(sorted(unknown))}')
+            )
+            return
+
+        if options['dry_run']:
+            for name, statements in changes:
+                self.stdout.write(f'-- {name}')
+                for statement in statements:
+                    self.stdout.write(f'{" ".join(statement.split())};')
+            return
+
+        try:
+            with connection.cursor() as cursor:
+                for name, statements in changes:
+                    for statement in statements:
+                        index_name = concurrent_index_name(statement)
+                        if index_name and drop_invalid_index(cursor, index_name):
+                            self.stdout.write(self.style.WARNING(f'Dropped invalid index {index_name}; rebuilding'))
+                        cursor.execute(statement)
+                    self.stdout.write(self.style.SUCCESS(f'Applied {name}'))
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error applying schema changes: {str(e)}')
+            )
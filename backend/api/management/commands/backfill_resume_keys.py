@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api.file_storage_views import get_folder_key_from_object_name
+from api.minio_utils import get_object_name_from_url
+
+
+class Command(BaseCommand):
+    help = 'Backfill resumes.object_key and resumes.folder_key from the stored public URLs in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows updated per transaction'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        last_id = 0
+        updated_total = 0
+        skipped_total = 0
+
+        try:
+            while True:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        SELECT id, url FROM resumes
+                        WHERE object_key IS NULL AND id > %s
+                        ORDER BY id
+                        LIMIT %s
+                        """,
+                        [last_id, batch_size]
+                    )
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+
+                    last_id = rows[-1][0]
+
+                    ids, object_keys, folder_keys = [], [], []
+                    for resume_id, url in rows:
+                        object_key = get_object_name_from_url(url or '')
+                        if not object_key:
+                            skipped_total += 1
+                            continue
+                        ids.append(resume_id)
+                        object_keys.append(object_key)
+                        folder_keys.append(get_folder_key_from_object_name(object_key))
+
+                    if ids:
+                        cursor.execute(
+                            """
+                            UPDATE resumes r
+                            SET object_key = v.object_key, folder_key = v.folder_key
+                            FROM unnest(%s::bigint[], %s::text[], %s::text[]) AS v(id, object_key, folder_key)
+                            WHERE r.id = v.id AND r.object_key IS NULL
+                            """,
+                            [ids, object_keys, folder_keys]
+                        )
+                        updated_total += cursor.rowcount
+
+                self.stdout.write(f'Backfilled up to resume id {last_id} ({updated_total} updated so far)')
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Successfully backfilled {updated_total} resume(s); skipped {skipped_total} without a parsable URL'
+                )
+            )
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error backfilling resume keys: {str(e)}')
+            )
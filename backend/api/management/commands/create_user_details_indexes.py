@@ -0,0 +1,182 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api.helpers import build_user_details_query
+from api.schema import drop_invalid_index
+
+
+# (index name, table, index definition) for every lookup made by get_user_details_data
+USER_DETAILS_INDEXES = [
+    ('idx_profiles_user_id', 'profiles', '(user_id)'),
+    (
+        'idx_assets_assetable_display_name',
+        'assets',
+        '(assetable_id, assetable_type, display_name) WHERE deleted_at IS NULL',
+    ),
+    (
+        'idx_links_linkable',
+        'links',
+        '(linkable_id, linkable_type) WHERE deleted_at IS NULL',
+    ),
+    ('idx_tags_project_type_user', 'tags', '(project_id, type, user_id)'),
+    (
+        'idx_tags_user_technology',
+        'tags',
+        "(user_id) WHERE type = 'technology' AND project_id IS NOT NULL",
+    ),
+    ('idx_project_settings_project_user', 'project_settings', '(project_id, user_id)'),
+    (
+        'idx_projects_user_public',
+        'projects',
+        '(user_id, sorting_order, created_at DESC) '
+        'WHERE deleted_at IS NULL AND is_public = TRUE AND hide_on_website = FALSE',
+    ),
+    ('idx_certifications_profile_live', 'certifications', '(profile_id) WHERE deleted_at IS NULL'),
+    ('idx_achievements_profile_live', 'achievements', '(profile_id) WHERE deleted_at IS NULL'),
+    ('idx_experiences_profile_live', 'experiences', '(profile_id) WHERE deleted_at IS NULL'),
+    ('idx_publications_profile_live', 'publications', '(profile_id) WHERE deleted_at IS NULL'),
+    ('idx_education_profile_live', 'education', '(profile_id) WHERE deleted_at IS NULL'),
+    ('idx_skills_profile', 'skills', '(profile_id)'),
+    ('idx_categories_user', 'categories', '(user_id)'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the composite and partial indexes used by the user details query concurrently, '
+        'and report EXPLAIN (ANALYZE, BUFFERS) timings before and after'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=str,
+            default='',
+            help='Comma-separated user ids to benchmark (defaults to a sample of users with profiles)'
+        )
+        parser.add_argument(
+            '--sample',
+            type=int,
+            default=5,
+            help='Number of users to sample when --users is not given'
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=3,
+            help='EXPLAIN ANALYZE runs per user; the fastest run is reported'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Print the index statements without executing anything'
+        )
+        parser.add_argument(
+            '--skip-explain',
+            action='store_true',
+            help='Only create the indexes, without the before/after timing report'
+        )
+
+    def handle(self, *args, **options):
+        statements = [
+            (name, table, f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {definition}')
+            for name, table, definition in USER_DETAILS_INDEXES
+        ]
+
+        if options['dry_run']:
+            for _, _, statement in statements:
+                self.stdout.write(f'{statement};')
+            return
+
+        try:
+            with connection.cursor() as cursor:
+                user_ids = [] if options['skip_explain'] else self.get_sample_user_ids(cursor, options)
+                runs = max(options['runs'], 1)
+
+                before = {user_id: self.explain_user(cursor, user_id, runs) for user_id in user_ids}
+
+                # CREATE INDEX CONCURRENTLY cannot run inside a transaction block;
+                # management commands run in autocommit mode, so each statement commits on its own.
+                for name, table, statement in statements:
+                    try:
+                        if drop_invalid_index(cursor, name):
+                            self.stdout.write(self.style.WARNING(f'Dropped invalid index {name}; rebuilding'))
+                        cursor.execute(statement)
+                        self.stdout.write(self.style.SUCCESS(f'Index {name} on {table} is in place'))
+                    except Exception as e:
+                        self.stdout.write(self.style.ERROR(f'Failed to create index {name} on {table}: {str(e)}'))
+
+                for table in sorted({table for _, table, _ in USER_DETAILS_INDEXES}):
+                    cursor.execute(f'ANALYZE {table}')
+
+                after = {user_id: self.explain_user(cursor, user_id, runs) for user_id in user_ids}
+
+            if user_ids:
+                self.print_report(user_ids, before, after)
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error creating user details indexes: {str(e)}')
+            )
+
+    def get_sample_user_ids(self, cursor, options):
+        if options['users']:
+            return [int(user_id) for user_id in options['users'].split(',') if user_id.strip()]
+
+        cursor.execute(
+            """
+            SELECT u.id FROM users u
+            JOIN profiles p ON p.user_id = u.id
+            ORDER BY random()
+            LIMIT %s
+            """,
+            [options['sample']]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def explain_user(self, cursor, user_id, runs):
+        """Run EXPLAIN (ANALYZE, BUFFERS) on the details query and keep the fastest run"""
+        best = None
+        for _ in range(runs):
+            cursor.execute(
+                'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ' + build_user_details_query(),
+                [user_id]
+            )
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            plan = plan[0]
+
+            result = {
+                'planning_ms': plan.get('Planning Time', 0.0),
+                'execution_ms': plan.get('Execution Time', 0.0),
+                'shared_hit': plan['Plan'].get('Shared Hit Blocks', 0),
+                'shared_read': plan['Plan'].get('Shared Read Blocks', 0),
+            }
+            if best is None or result['execution_ms'] < best['execution_ms']:
+                best = result
+        return best
+
+    def print_report(self, user_ids, before, after):
+        self.stdout.write('')
+        self.stdout.write(
+            f"{'user_id':>10} {'before ms':>12} {'after ms':>12} {'speedup':>9} "
+            f"{'buffers before':>16} {'buffers after':>15}"
+        )
+        for user_id in user_ids:
+            b, a = before[user_id], after[user_id]
+            speedup = b['execution_ms'] / a['execution_ms'] if a['execution_ms'] else 0.0
+            self.stdout.write(
+                f"{user_id:>10} {b['execution_ms']:>12.3f} {a['execution_ms']:>12.3f} {speedup:>8.2f}x "
+                f"{b['shared_hit'] + b['shared_read']:>16} {a['shared_hit'] + a['shared_read']:>15}"
+            )
+
+        total_before = sum(before[user_id]['execution_ms'] for user_id in user_ids)
+        total_after = sum(after[user_id]['execution_ms'] for user_id in user_ids)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Total execution time: {total_before:.3f} ms before, {total_after:.3f} ms after '
+                f'across {len(user_ids)} user(s)'
+            )
+        )
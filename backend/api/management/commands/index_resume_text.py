@@ -0,0 +1,94 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api.blobs import adopt_legacy_blobs
+from api.search_index import index_blobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Extract and index the text of stored resumes that have not been indexed yet, '
+        'first giving rows stored before deduplication a blob so they become searchable'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Blobs fetched and extracted per batch'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Stop after this many blobs (0 means no limit)'
+        )
+        parser.add_argument(
+            '--skip-adopt',
+            action='store_true',
+            help='Do not create blobs for rows stored before deduplication'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        limit = options['limit']
+
+        try:
+            if not options['skip_adopt']:
+                self.adopt_legacy_rows(batch_size)
+
+            last_id = 0
+            indexed_total = 0
+            scanned_total = 0
+            while not limit or scanned_total < limit:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        SELECT id, object_key FROM resume_blobs
+                        WHERE content_extracted_at IS NULL AND ref_count > 0 AND id > %s
+                        ORDER BY id
+                        LIMIT %s
+                        """,
+                        [last_id, min(batch_size, limit - scanned_total) if limit else batch_size]
+                    )
+                    blob_rows = cursor.fetchall()
+                if not blob_rows:
+                    break
+
+                last_id = blob_rows[-1][0]
+                scanned_total += len(blob_rows)
+                indexed_total += index_blobs(blob_rows)
+                self.stdout.write(f'Indexed up to blob id {last_id} ({indexed_total} of {scanned_total} so far)')
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Successfully indexed {indexed_total} of {scanned_total} pending blob(s)'
+                )
+            )
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error indexing resume text: {str(e)}')
+            )
+
+    def adopt_legacy_rows(self, batch_size):
+        last_id = 0
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id FROM resumes
+                    WHERE blob_id IS NULL AND object_key IS NOT NULL AND (deleted_at IS NULL) AND id > %s
+                    ORDER BY id
+                    LIMIT %s
+                    """,
+                    [last_id, batch_size]
+                )
+                resume_ids = [row[0] for row in cursor.fetchall()]
+                if not resume_ids:
+                    return
+
+                last_id = resume_ids[-1]
+                adopt_legacy_blobs(cursor, resume_ids)
+
+            self.stdout.write(f'Created blobs for rows up to resume id {last_id}')
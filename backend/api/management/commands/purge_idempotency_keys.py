@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Delete expired Idempotency-Key results in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows deleted per statement'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        deleted_total = 0
+
+        try:
+            with connection.cursor() as cursor:
+                while True:
+                    cursor.execute(
+                        """
+                        DELETE FROM idempotency_keys
+                        WHERE id IN (
+                            SELECT id FROM idempotency_keys
+                            WHERE expires_at < %s
+                            LIMIT %s
+                        )
+                        """,
+                        [timezone.now(), batch_size]
+                    )
+                    deleted_total += cursor.rowcount
+                    if cursor.rowcount < batch_size:
+                        break
+
+            self.stdout.write(
+                self.style.SUCCESS(f'Successfully deleted {deleted_total} expired idempotency key(s)')
+            )
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error purging idempotency keys: {str(e)}')
+            )
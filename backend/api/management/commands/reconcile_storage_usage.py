@@ -0,0 +1,185 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.storage import get_storage
+
+
+class Command(BaseCommand):
+    help = (
+        'Record missing resume sizes from their blobs or the bucket, then recompute every profile\'s '
+        'storage usage counter from its live resumes and correct any drift'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Resumes sized, or profiles recomputed, per transaction'
+        )
+        parser.add_argument(
+            '--skip-sizes',
+            action='store_true',
+            help='Only recompute the counters; do not fill in missing sizes'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted counters without correcting them (sizes are not filled in either)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        dry_run = options['dry_run']
+
+        try:
+            if not options['skip_sizes'] and not dry_run:
+                self.backfill_sizes(batch_size)
+
+            checked, drifted = self.recompute_usage(batch_size, dry_run)
+
+            verb = 'Found' if dry_run else 'Corrected'
+            self.stdout.write(
+                self.style.SUCCESS(f'Checked {checked} profile(s); {verb} {drifted} drifted counter(s)')
+            )
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error reconciling storage usage: {str(e)}')
+            )
+
+    def backfill_sizes(self, batch_size):
+        storage = get_storage()
+        last_id = 0
+        sized_total = 0
+        missing_total = 0
+
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT r.id, r.object_key, b.size FROM resumes r
+                    LEFT JOIN resume_blobs b ON b.id = r.blob_id
+                    WHERE r.size IS NULL AND r.deleted_at IS NULL AND r.object_key IS NOT NULL AND r.id > %s
+                    ORDER BY r.id
+                    LIMIT %s
+                    """,
+                    [last_id, batch_size]
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+
+                last_id = rows[-1][0]
+
+                ids, sizes = [], []
+                for resume_id, object_key, blob_size in rows:
+                    if blob_size is None:
+                        stored_object = storage.stat(object_key)
+                        if stored_object is None:
+                            missing_total += 1
+                            continue
+                        blob_size = stored_object.size
+                    ids.append(resume_id)
+                    sizes.append(blob_size)
+
+                if ids:
+                    cursor.execute(
+                        """
+                        UPDATE resumes r
+                        SET size = v.size
+                        FROM unnest(%s::bigint[], %s::bigint[]) AS v(id, size)
+                        WHERE r.id = v.id AND r.size IS NULL
+                        """,
+                        [ids, sizes]
+                    )
+                    sized_total += cursor.rowcount
+
+            self.stdout.write(f'Sized resumes up to id {last_id} ({sized_total} so far)')
+
+        self.stdout.write(
+            f'Recorded {sized_total} missing size(s); {missing_total} object(s) not found in storage'
+        )
+
+    def recompute_usage(self, batch_size, dry_run):
+        """
+        Recompute counters a batch of profiles at a time. Locking the counter rows first makes
+        concurrent uploads and deletes wait, so their rows and counter changes land either
+        before the sums are taken or after the corrected values are written.
+        """
+        last_id = 0
+        checked = 0
+        drifted = 0
+
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT id FROM profiles WHERE id > %s ORDER BY id LIMIT %s",
+                    [last_id, batch_size]
+                )
+                profile_ids = [row[0] for row in cursor.fetchall()]
+                if not profile_ids:
+                    break
+
+                last_id = profile_ids[-1]
+                now = timezone.now()
+
+                if not dry_run:
+                    cursor.execute(
+                        """
+                        INSERT INTO profile_storage_usage (profile_id, used_bytes, file_count, updated_at)
+                        SELECT profile_id, 0, 0, %s FROM unnest(%s::bigint[]) AS profile_id
+                        ON CONFLICT (profile_id) DO NOTHING
+                        """,
+                        [now, profile_ids]
+                    )
+
+                cursor.execute(
+                    """
+                    SELECT profile_id, used_bytes, file_count FROM profile_storage_usage
+                    WHERE profile_id = ANY(%s)
+                    FOR UPDATE
+                    """,
+                    [profile_ids]
+                )
+                counters = {profile_id: (used_bytes, file_count) for profile_id, used_bytes, file_count in cursor.fetchall()}
+
+                cursor.execute(
+                    """
+                    SELECT profile_id, COALESCE(sum(size), 0), count(*) FROM resumes
+                    WHERE profile_id = ANY(%s) AND deleted_at IS NULL
+                    GROUP BY profile_id
+                    """,
+                    [profile_ids]
+                )
+                actual = {profile_id: (used_bytes, file_count) for profile_id, used_bytes, file_count in cursor.fetchall()}
+
+                corrections = []
+                for profile_id in profile_ids:
+                    expected = actual.get(profile_id, (0, 0))
+                    if counters.get(profile_id, (0, 0)) != expected:
+                        corrections.append((profile_id, expected))
+                        self.stdout.write(
+                            f'Profile {profile_id}: counter {counters.get(profile_id, (0, 0))}, actual {expected}'
+                        )
+
+                checked += len(profile_ids)
+                drifted += len(corrections)
+
+                if corrections and not dry_run:
+                    cursor.execute(
+                        """
+                        UPDATE profile_storage_usage u
+                        SET used_bytes = v.used_bytes, file_count = v.file_count, updated_at = %s
+                        FROM unnest(%s::bigint[], %s::bigint[], %s::int[]) AS v(profile_id, used_bytes, file_count)
+                        WHERE u.profile_id = v.profile_id
+                        """,
+                        [
+                            now,
+                            [profile_id for profile_id, _ in corrections],
+                            [used_bytes for _, (used_bytes, _) in corrections],
+                            [file_count for _, (_, file_count) in corrections],
+                        ]
+                    )
+
+        return checked, drifted
@@ -0,0 +1,103 @@
+import io
+import os
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from api.storage import create_storage, STORAGE_BACKENDS, STORAGE_BUCKET, LOCAL_STORAGE_ROOT
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure upload, copy and list throughput of each storage backend. Objects are written under '
+        'a unique benchmark/ prefix and removed afterwards'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backend',
+            action='append',
+            choices=list(STORAGE_BACKENDS),
+            help='Backend to measure; repeat for several (default: all)'
+        )
+        parser.add_argument(
+            '--objects',
+            type=int,
+            default=100,
+            help='Objects uploaded and copied per backend'
+        )
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=256 * 1024,
+            help='Size of each object in bytes'
+        )
+        parser.add_argument(
+            '--bucket',
+            type=str,
+            default=STORAGE_BUCKET,
+            help='Bucket (or directory under the local root) to write to'
+        )
+        parser.add_argument(
+            '--local-root',
+            type=str,
+            default=LOCAL_STORAGE_ROOT,
+            help='Root directory of the local backend'
+        )
+
+    def handle(self, *args, **options):
+        backend_names = options['backend'] or list(STORAGE_BACKENDS)
+        object_count = max(options['objects'], 1)
+        object_size = max(options['size'], 0)
+        payload = os.urandom(object_size)
+
+        for backend_name in backend_names:
+            kwargs = {'bucket_name': options['bucket']}
+            if backend_name == 'local':
+                kwargs['root'] = options['local_root']
+
+            try:
+                storage = create_storage(backend_name, **kwargs)
+                results = self.benchmark(storage, payload, object_count)
+            except Exception as e:
+                self.stdout.write(
+                    self.style.ERROR(f'{backend_name}: benchmark failed: {str(e)}')
+                )
+                continue
+
+            self.stdout.write(self.style.SUCCESS(f'{backend_name}:'))
+            for operation, (count, total_bytes, elapsed) in results.items():
+                self.stdout.write(
+                    f'  {operation:<6} {count} object(s) in {elapsed:.3f}s: '
+                    f'{count / elapsed if elapsed > 0 else 0:.1f} objects/s, '
+                    f'{total_bytes / elapsed / (1024 * 1024) if elapsed > 0 else 0:.2f} MiB/s'
+                )
+
+    def benchmark(self, storage, payload, object_count):
+        """Returns {operation: (objects, bytes, seconds)} for upload, copy and list"""
+        prefix = f'benchmark/{uuid.uuid4().hex}/'
+        names = [f'{prefix}source/{index:06d}' for index in range(object_count)]
+        copies = [f'{prefix}copy/{index:06d}' for index in range(object_count)]
+        results = {}
+
+        try:
+            started_at = time.monotonic()
+            for name in names:
+                storage.put(name, io.BytesIO(payload), len(payload), 'application/octet-stream')
+            results['upload'] = (object_count, object_count * len(payload), time.monotonic() - started_at)
+
+            started_at = time.monotonic()
+            for source, destination in zip(names, copies):
+                storage.copy(source, destination)
+            results['copy'] = (object_count, object_count * len(payload), time.monotonic() - started_at)
+
+            started_at = time.monotonic()
+            listed = sum(1 for _ in storage.list(prefix, recursive=True))
+            results['list'] = (listed, 0, time.monotonic() - started_at)
+        finally:
+            failures = storage.delete_many(names + copies)
+            for name, message in failures:
+                self.stdout.write(self.style.WARNING(f'Failed to remove {name}: {message}'))
+
+        return results
@@ -0,0 +1,247 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.blobs import BLOB_KEY_PREFIX
+from api.minio_utils import REMOVE_OBJECTS_BATCH_SIZE
+from api.storage import get_storage
+
+
+# Arbitrary constant shared by every storage_gc run, so only one can hold the lock at a time
+STORAGE_GC_LOCK_ID = 7400312
+
+PLACEHOLDER_NAME = '.keep'
+
+
+class Command(BaseCommand):
+    help = (
+        'Remove bucket objects whose resumes/folders rows were soft-deleted longer ago than the retention '
+        'window, objects no row references at all (including blobs/ objects left by rolled back uploads), '
+        'and blobs whose reference count has stayed at zero'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days',
+            type=float,
+            default=7,
+            help='Only remove objects deleted (or, for unreferenced objects, last modified) longer ago than this'
+        )
+        parser.add_argument(
+            '--prefix',
+            type=str,
+            default='',
+            help='Only scan objects under this key prefix (e.g. "<username>/resumes/")'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=REMOVE_OBJECTS_BATCH_SIZE,
+            help=f'Objects checked and removed per page (at most {REMOVE_OBJECTS_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be removed without removing anything'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, min(options['batch_size'], REMOVE_OBJECTS_BATCH_SIZE))
+        cutoff = timezone.now() - timedelta(days=options['retention_days'])
+        dry_run = options['dry_run']
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_try_advisory_lock(%s)', [STORAGE_GC_LOCK_ID])
+                if not cursor.fetchone()[0]:
+                    self.stdout.write(self.style.WARNING('Another storage_gc run holds the lock; exiting'))
+                    return
+
+                try:
+                    # Rows without object_key would make their objects look unreferenced
+                    cursor.execute('SELECT count(*) FROM resumes WHERE object_key IS NULL')
+                    missing_keys = cursor.fetchone()[0]
+                    if missing_keys:
+                        self.stdout.write(
+                            self.style.ERROR(
+                                f'{missing_keys} resume(s) have no object_key; run backfill_resume_keys first'
+                            )
+                        )
+                        return
+
+                    totals = self.collect(cursor, options['prefix'], cutoff, batch_size, dry_run)
+                    self.collect_blobs(cursor, cutoff, batch_size, dry_run, totals)
+                finally:
+                    cursor.execute('SELECT pg_advisory_unlock(%s)', [STORAGE_GC_LOCK_ID])
+
+            verb = 'Would remove' if dry_run else 'Removed'
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'{verb} {totals["removed"]} of {totals["scanned"]} scanned object(s), '
+                    f'{totals["bytes"]} bytes reclaimed'
+                    + (f'; {totals["failed"]} failed' if totals['failed'] else '')
+                )
+            )
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error collecting storage garbage: {str(e)}')
+            )
+
+    def collect(self, cursor, prefix, cutoff, batch_size, dry_run):
+        storage = get_storage()
+        totals = {'scanned': 0, 'removed': 0, 'bytes': 0, 'failed': 0}
+
+        page = []
+        for storage_object in storage.list(prefix, recursive=True):
+            page.append(storage_object)
+            if len(page) >= batch_size:
+                self.collect_page(cursor, page, cutoff, dry_run, totals)
+                page = []
+
+        if page:
+            self.collect_page(cursor, page, cutoff, dry_run, totals)
+
+        return totals
+
+    def collect_page(self, cursor, page, cutoff, dry_run, totals):
+        totals['scanned'] += len(page)
+        # Only keys this service writes are candidates: <username>/resumes/... and blobs/<xx>/<sha256>.
+        # A blob object without a resume_blobs row was stored by an upload whose transaction rolled back.
+        objects = {
+            storage_object.name: storage_object
+            for storage_object in page
+            if storage_object.name.split('/')[1:2] == ['resumes']
+            or storage_object.name.startswith(f'{BLOB_KEY_PREFIX}/')
+        }
+
+        placeholders = {}
+        for object_name in objects:
+            parts = object_name.split('/')
+            if parts[-1] == PLACEHOLDER_NAME and len(parts) >= 4:
+                placeholders[object_name] = (parts[0], '/'.join(parts[2:-1]))
+
+        file_names = [object_name for object_name in objects if object_name not in placeholders]
+
+        # name -> (still referenced by a live row, latest deleted_at of the rows referencing it).
+        # Objects owned by a blob are left to collect_blobs, which goes by reference count.
+        references = {}
+        if file_names:
+            cursor.execute(
+                """
+                SELECT
+                    v.name,
+                    EXISTS (SELECT 1 FROM resumes r WHERE r.object_key = v.name AND r.deleted_at IS NULL)
+                        OR EXISTS (SELECT 1 FROM resume_blobs b WHERE b.object_key = v.name),
+                    (SELECT max(r.deleted_at) FROM resumes r WHERE r.object_key = v.name)
+                FROM unnest(%s::text[]) AS v(name)
+                """,
+                [file_names]
+            )
+            references.update({name: (live, deleted_at) for name, live, deleted_at in cursor.fetchall()})
+
+        if placeholders:
+            names = list(placeholders)
+            cursor.execute(
+                """
+                SELECT
+                    v.name,
+                    EXISTS (
+                        SELECT 1 FROM folders f
+                        JOIN profiles p ON f.profile_id = p.id
+                        JOIN users u ON p.user_id = u.id
+                        WHERE u.username = v.username AND f.folder_key = v.folder_key AND f.deleted_at IS NULL
+                    ),
+                    (
+                        SELECT max(f.deleted_at) FROM folders f
+                        JOIN profiles p ON f.profile_id = p.id
+                        JOIN users u ON p.user_id = u.id
+                        WHERE u.username = v.username AND f.folder_key = v.folder_key
+                    )
+                FROM unnest(%s::text[], %s::text[], %s::text[]) AS v(name, username, folder_key)
+                """,
+                [
+                    names,
+                    [placeholders[name][0] for name in names],
+                    [placeholders[name][1] for name in names],
+                ]
+            )
+            references.update({name: (live, deleted_at) for name, live, deleted_at in cursor.fetchall()})
+
+        garbage = []
+        for object_name, storage_object in objects.items():
+            live, deleted_at = references.get(object_name, (False, None))
+            if live:
+                continue
+
+            if deleted_at is not None:
+                expired = deleted_at < cutoff
+            else:
+                # Unreferenced: a failed or abandoned upload, or one whose row is still being written
+                expired = storage_object.last_modified is not None and storage_object.last_modified < cutoff
+
+            if expired:
+                garbage.append(storage_object)
+
+        if not garbage:
+            return
+
+        failed = set()
+        if not dry_run:
+            failed = {name for name, _ in get_storage().delete_many([obj.name for obj in garbage])}
+            for name in failed:
+                self.stdout.write(self.style.WARNING(f'Failed to remove {name}'))
+
+        for storage_object in garbage:
+            if storage_object.name in failed:
+                totals['failed'] += 1
+                continue
+            totals['removed'] += 1
+            totals['bytes'] += storage_object.size or 0
+            if dry_run:
+                self.stdout.write(f'Would remove {storage_object.name} ({storage_object.size or 0} bytes)')
+
+    def collect_blobs(self, cursor, cutoff, batch_size, dry_run, totals):
+        """
+        Remove blobs whose reference count reached zero before the cutoff.
+        Each batch locks its rows and removes the objects before the rows are deleted and committed,
+        so an upload of the same content waits and then recreates the blob together with its object.
+        """
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                cursor.execute(
+                    """
+                    SELECT id, object_key, size FROM resume_blobs
+                    WHERE ref_count <= 0 AND updated_at < %s AND id > %s
+                    ORDER BY id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                    """,
+                    [cutoff, last_id, batch_size]
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    return
+
+                last_id = rows[-1][0]
+                totals['scanned'] += len(rows)
+
+                if dry_run:
+                    for _, object_key, size in rows:
+                        self.stdout.write(f'Would remove blob {object_key} ({size or 0} bytes)')
+                    totals['removed'] += len(rows)
+                    totals['bytes'] += sum(size or 0 for _, _, size in rows)
+                    continue
+
+                failed = {name for name, _ in get_storage().delete_many([object_key for _, object_key, _ in rows])}
+                removed = [(blob_id, size) for blob_id, object_key, size in rows if object_key not in failed]
+
+                cursor.execute(
+                    "DELETE FROM resume_blobs WHERE id = ANY(%s)",
+                    [[blob_id for blob_id, _ in removed]]
+                )
+                totals['removed'] += len(removed)
+                totals['bytes'] += sum(size or 0 for _, size in removed)
+                totals['failed'] += len(failed)
@@ -1,5 +1,16 @@
+import hashlib
 import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from urllib.parse import urlparse
+import certifi
+from django.utils.http import content_disposition_header
+import urllib3
 from minio import Minio
+from minio.commonconfig import CopySource, ComposeSource
+from minio.datatypes import PostPolicy
+from minio.deleteobjects import DeleteObject
 from minio.error import S3Error
 
 
@@ -14,6 +25,24 @@ MINIO_SECRET_KEY = os.getenv('MINIO_SECRET_KEY')
 MINIO_USE_SSL_STR = os.getenv('MINIO_USE_SSL', 'false').lower()
 MINIO_USE_SSL = MINIO_USE_SSL_STR in ('true', '1', 'yes')
 
+# Connection pool and timeouts for the shared per-process client
+MINIO_POOL_MAXSIZE = int(os.getenv('MINIO_POOL_MAXSIZE', '20'))
+MINIO_CONNECT_TIMEOUT = float(os.getenv('MINIO_CONNECT_TIMEOUT', '5'))
+MINIO_READ_TIMEOUT = float(os.getenv('MINIO_READ_TIMEOUT', '60'))
+MINIO_MAX_RETRIES = int(os.getenv('MINIO_MAX_RETRIES', '3'))
+
+# Lifetime of presigned URLs handed to browsers
+MINIO_PRESIGN_EXPIRY_SECONDS = int(os.getenv('MINIO_PRESIGN_EXPIRY_SECONDS', '900'))
+
+# A single CopyObject request is limited to 5 GiB; larger objects are copied part by part with compose_object
+MAX_SINGLE_COPY_SIZE = 5 * 1024 * 1024 * 1024
+
+# Part size for streamed uploads; 5 MiB is the S3 minimum and bounds the memory held per upload
+UPLOAD_PART_SIZE = 5 * 1024 * 1024
+
+# A multi-object DeleteObjects request accepts at most 1000 keys
+REMOVE_OBJECTS_BATCH_SIZE = 1000
+
 
 def parse_endpoint(endpoint: str):
     """Parse MinIO endpoint to extract host and port"""
@@ -31,8 +60,8 @@ def parse_endpoint(endpoint: str):
     return host, port
 
 
-def get_minio_client():
-    """Get or create MinIO client"""
+def create_minio_client():
+    """Create a MinIO client with a tuned urllib3 connection pool"""
     if not MINIO_ENDPOINT:
         raise Exception('MINIO_ENDPOINT environment variable is not set')
     
@@ -50,76 +79,365 @@ def get_minio_client():
     endpoint = f"{host}:{port}" if port else host
     
 
-    print(f'MinIO Configuration: endpoint={endpoint}, secure={MINIO_USE_SSL}, bucket={MINIO_BUCKET}')
+    print(f'MinIO Configuration: endpoint={endpoint}, secure={MINIO_USE_SSL}, bucket={MINIO_BUCKET}, pool_maxsize={MINIO_POOL_MAXSIZE}')
+    
+    http_client = urllib3.PoolManager(
+        timeout=urllib3.Timeout(connect=MINIO_CONNECT_TIMEOUT, read=MINIO_READ_TIMEOUT),
+        maxsize=MINIO_POOL_MAXSIZE,
+        block=False,
+        cert_reqs='CERT_REQUIRED',
+        ca_certs=os.environ.get('SSL_CERT_FILE') or certifi.where(),
+        retries=urllib3.Retry(
+            total=MINIO_MAX_RETRIES,
+            backoff_factor=0.2,
+            status_forcelist=[500, 502, 503, 504]
+        )
+    )
     
     try:
         return Minio(
             endpoint=endpoint,
             access_key=MINIO_ACCESS_KEY,
             secret_key=MINIO_SECRET_KEY,
-            secure=MINIO_USE_SSL
+            secure=MINIO_USE_SSL,
+            region=MINIO_REGION,
+            http_client=http_client
         )
     except Exception as e:
         print(f'Error creating MinIO client: {e}')
         raise
 
 
+_operation_stats = {}
+_operation_stats_lock = threading.Lock()
+
+
+def record_operation(operation: str, elapsed: float, failed: bool):
+    """Accumulate latency and error counters for a storage operation"""
+    with _operation_stats_lock:
+        stats = _operation_stats.setdefault(operation, {
+            'count': 0,
+            'errors': 0,
+            'total_seconds': 0.0,
+            'max_seconds': 0.0,
+        })
+        stats['count'] += 1
+        stats['total_seconds'] += elapsed
+        stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+        if failed:
+            stats['errors'] += 1
+
+
+def get_operation_stats():
+    """Snapshot of per-operation counters for this process"""
+    with _operation_stats_lock:
+        return {
+            operation: {
+                'count': stats['count'],
+                'errors': stats['errors'],
+                'avg_ms': round(stats['total_seconds'] * 1000 / stats['count'], 3) if stats['count'] else 0.0,
+                'max_ms': round(stats['max_seconds'] * 1000, 3),
+            }
+            for operation, stats in _operation_stats.items()
+        }
+
+
+class InstrumentedMinio:
+    """
+    Thin proxy around a Minio client that times every public method call.
+    For lazy iterators (list_objects) only the call itself is timed, not the iteration.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        def timed_call(*args, **kwargs):
+            started_at = time.monotonic()
+            failed = False
+            try:
+                return attr(*args, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                record_operation(name, time.monotonic() - started_at, failed)
+
+        return timed_call
+
 
 minio_client = None
+_minio_client_lock = threading.Lock()
 
 
-def ensure_bucket_exists(bucket_name: str):
-    """Ensure bucket exists, create if it doesn't"""
+def get_minio_client():
+    """Get the MinIO client shared by every thread in this process, creating it on first use"""
     global minio_client
     if minio_client is None:
-        minio_client = get_minio_client()
+        with _minio_client_lock:
+            if minio_client is None:
+                minio_client = InstrumentedMinio(create_minio_client())
+    return minio_client
+
+
+presign_client = None
+_presign_client_lock = threading.Lock()
+
+
+def get_presign_client():
+    """
+    Get or create the MinIO client used to sign URLs for browsers.
+    Presigned signatures cover the host, so this client is built from MINIO_PUBLIC_URL
+    rather than the internal endpoint. Signing is local and makes no network calls
+    because the region is fixed.
+    """
+    global presign_client
+    if presign_client is not None:
+        return presign_client
+    
+    if not MINIO_PUBLIC_URL:
+        raise Exception('MINIO_PUBLIC_URL environment variable is not set')
+    
+    parsed = urlparse(MINIO_PUBLIC_URL)
+    if not parsed.netloc:
+        raise Exception('Failed to parse MINIO_PUBLIC_URL')
+    
+    with _presign_client_lock:
+        if presign_client is None:
+            presign_client = Minio(
+                endpoint=parsed.netloc,
+                access_key=MINIO_ACCESS_KEY,
+                secret_key=MINIO_SECRET_KEY,
+                secure=parsed.scheme == 'https',
+                region=MINIO_REGION
+            )
+    return presign_client
+
+
+def with_public_path_prefix(url: str):
+    """
+    Re-insert the path prefix of MINIO_PUBLIC_URL (e.g. https://example.com/storage) into a URL signed
+    by the presign client. The signature covers /<bucket>/<object> as MinIO sees it behind the proxy
+    that strips the prefix, so only the URL the browser requests changes.
+    """
+    prefix = urlparse(MINIO_PUBLIC_URL or '').path.rstrip('/')
+    if not prefix:
+        return url
+    
+    parsed = urlparse(url)
+    return parsed._replace(path=prefix + parsed.path).geturl()
+
+
+def get_presigned_upload_post(bucket_name: str, object_name: str, content_type: str, size: int, expires_seconds: int = MINIO_PRESIGN_EXPIRY_SECONDS):
+    """
+    Generate a presigned POST policy that only accepts exactly size bytes of content_type at object_name.
+    Returns (url, fields): the browser POSTs multipart/form-data with every field, then the file last.
+    """
+    policy = PostPolicy(bucket_name, datetime.now(dt_timezone.utc) + timedelta(seconds=expires_seconds))
+    policy.add_equals_condition('key', object_name)
+    policy.add_equals_condition('Content-Type', content_type)
+    policy.add_content_length_range_condition(size, size)
+    
+    fields = get_presign_client().presigned_post_policy(policy)
+    fields['key'] = object_name
+    fields['Content-Type'] = content_type
+    return f"{MINIO_PUBLIC_URL.rstrip('/')}/{bucket_name}", fields
+
+
+def get_presigned_download_url(bucket_name: str, object_name: str, filename: str = None, expires_seconds: int = MINIO_PRESIGN_EXPIRY_SECONDS):
+    """Generate a short-lived presigned GET URL, optionally forcing a download filename"""
+    response_headers = None
+    if filename:
+        response_headers = {'response-content-disposition': content_disposition_header(True, filename)}
+    
+    return with_public_path_prefix(get_presign_client().presigned_get_object(
+        bucket_name,
+        object_name,
+        expires=timedelta(seconds=expires_seconds),
+        response_headers=response_headers
+    ))
+
+
+def get_object_stream(bucket_name: str, object_name: str, offset: int = 0, length: int = 0):
+    """
+    Open an object (or a byte range of it) for streaming.
+    The caller must close() and release_conn() the returned response.
+    """
+    minio_client = get_minio_client()
+    
+    return minio_client.get_object(bucket_name, object_name, offset=offset, length=length)
+
+
+def stat_object(bucket_name: str, object_name: str):
+    """
+    Get object metadata (size, content type, etag, last modified) without reading it.
+    Returns None if the object does not exist.
+    """
+    minio_client = get_minio_client()
     
     try:
-        found = minio_client.bucket_exists(bucket_name)
-        if not found:
-            minio_client.make_bucket(bucket_name, location=MINIO_REGION)
+        return minio_client.stat_object(bucket_name, object_name)
     except S3Error as e:
-        print(f'Error ensuring bucket exists: {e}')
-        raise
-    except Exception as e:
-        print(f'Error connecting to MinIO: {e}')
+        if e.code in ('NoSuchKey', 'NoSuchObject', 'NotFound'):
+            return None
+        print(f'Error reading object metadata from MinIO: {e}')
         raise
 
 
-def upload_file(bucket_name: str, object_name: str, file_data: bytes, content_type: str):
+def read_object_range(bucket_name: str, object_name: str, offset: int, length: int) -> bytes:
+    """Read a byte range of an object, e.g. its leading bytes for a signature check"""
+    minio_client = get_minio_client()
+    
+    response = minio_client.get_object(bucket_name, object_name, offset=offset, length=length)
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def remove_objects(bucket_name: str, object_names):
+    """
+    Remove many objects with multi-object DeleteObjects requests of up to REMOVE_OBJECTS_BATCH_SIZE keys.
+    Missing objects are not errors. Returns a list of (object name, error message) for keys that failed.
+    """
+    minio_client = get_minio_client()
+    object_names = list(object_names)
+    failures = []
+    
+    for start in range(0, len(object_names), REMOVE_OBJECTS_BATCH_SIZE):
+        batch = object_names[start:start + REMOVE_OBJECTS_BATCH_SIZE]
+        # remove_objects is lazy: the request is only sent while its error iterator is consumed
+        for error in minio_client.remove_objects(bucket_name, [DeleteObject(name) for name in batch]):
+            failures.append((error.name, error.message))
+    
+    return failures
+
+
+_verified_buckets = set()
+_verified_buckets_lock = threading.Lock()
+
+
+def ensure_bucket_exists(bucket_name: str):
+    """
+    Ensure bucket exists, create if it doesn't.
+    The check is memoized per process, so only the first call per bucket hits the network.
+    """
+    if bucket_name in _verified_buckets:
+        return
+    
+    minio_client = get_minio_client()
+    
+    with _verified_buckets_lock:
+        if bucket_name in _verified_buckets:
+            return
+        
+        try:
+            found = minio_client.bucket_exists(bucket_name)
+            if not found:
+                minio_client.make_bucket(bucket_name, location=MINIO_REGION)
+            _verified_buckets.add(bucket_name)
+        except S3Error as e:
+            print(f'Error ensuring bucket exists: {e}')
+            raise
+        except Exception as e:
+            print(f'Error connecting to MinIO: {e}')
+            raise
+
+
+class UploadValidationError(Exception):
+    """Raised by ValidatingUploadStream when an upload fails validation mid-stream"""
+    pass
+
+
+class ValidatingUploadStream:
+    """
+    File-like wrapper that MinIO reads from during put_object.
+    Enforces a maximum size and checks the leading bytes against allowed signatures
+    as the data streams through, and records how many bytes were read and their SHA-256.
+    """
+
+    def __init__(self, source, max_size=None, signatures=None):
+        self.source = source
+        self.max_size = max_size
+        self.signatures = signatures or []
+        self.bytes_read = 0
+        self._signature_length = max((len(sig) for sig in self.signatures), default=0)
+        self._head = b'' if self.signatures else None
+        self._sha256 = hashlib.sha256()
+
+    def _check_signature(self):
+        if not any(self._head.startswith(sig) for sig in self.signatures):
+            raise UploadValidationError('File content does not match its declared type')
+        self._head = None
+
+    def read(self, size=-1):
+        chunk = self.source.read(size)
+
+        if chunk:
+            self.bytes_read += len(chunk)
+            self._sha256.update(chunk)
+            if self.max_size is not None and self.bytes_read > self.max_size:
+                raise UploadValidationError(f'File exceeds the maximum size of {self.max_size} bytes')
+
+            if self._head is not None:
+                self._head += chunk[:self._signature_length]
+                if len(self._head) >= self._signature_length:
+                    self._check_signature()
+        elif self._head is not None:
+            self._check_signature()
+
+        return chunk
+
+    def hexdigest(self):
+        """SHA-256 of the bytes read so far"""
+        return self._sha256.hexdigest()
+
+
+def upload_stream(bucket_name: str, object_name: str, stream, length: int, content_type: str):
     """
-    Upload file to MinIO
+    Stream a file-like object into MinIO without loading it into memory.
+    Objects larger than UPLOAD_PART_SIZE are sent as multipart uploads, one part in memory at a time.
     
     Args:
         bucket_name: Name of the bucket
         object_name: Object name (path) in bucket
-        file_data: File data as bytes
+        stream: Object with a read(size) method, e.g. a Django UploadedFile or ValidatingUploadStream
+        length: Total size in bytes, or -1 if unknown
         content_type: MIME type of the file
     
     Returns:
-        Object name if successful
+        Dict with object_name, bytes, seconds and throughput_bytes_per_second
     """
-    global minio_client
-    if minio_client is None:
-        minio_client = get_minio_client()
+    minio_client = get_minio_client()
     
     try:
-
         ensure_bucket_exists(bucket_name)
         
-
-        from io import BytesIO
-        file_buffer = BytesIO(file_data)
-        
+        started_at = time.monotonic()
         minio_client.put_object(
             bucket_name,
             object_name,
-            file_buffer,
-            length=len(file_data),
-            content_type=content_type
+            stream,
+            length=length,
+            content_type=content_type,
+            part_size=UPLOAD_PART_SIZE
         )
+        elapsed = time.monotonic() - started_at
         
-        return object_name
+        uploaded_bytes = getattr(stream, 'bytes_read', length)
+        return {
+            'object_name': object_name,
+            'bytes': uploaded_bytes,
+            'seconds': round(elapsed, 4),
+            'throughput_bytes_per_second': int(uploaded_bytes / elapsed) if elapsed > 0 else None
+        }
+    except UploadValidationError:
+        raise
     except S3Error as e:
         print(f'Error uploading file to MinIO: {e}')
         raise
@@ -133,35 +451,48 @@ def get_public_url(bucket_name: str, object_name: str):
     return f"{MINIO_PUBLIC_URL}/{bucket_name}/{object_name}"
 
 
-def download_file(bucket_name: str, object_name: str) -> bytes:
+def get_object_name_from_url(url: str):
     """
-    Download file from MinIO
-    
-    Args:
-        bucket_name: Name of the bucket
-        object_name: Object name (path) in bucket
+    Recover the object name from a public URL built by get_public_url.
+    Returns None if the URL has no path.
+    """
+    path_parts = [p for p in urlparse(url).path.strip('/').split('/') if p]
+    if not path_parts:
+        return None
+
+    return '/'.join(path_parts[1:]) if len(path_parts) > 1 else path_parts[0]
+
+
+def copy_object(bucket_name: str, source_object_name: str, dest_object_name: str):
+    """
+    Copy an object server-side, so the bytes never pass through this process.
+    Objects larger than MAX_SINGLE_COPY_SIZE are copied with a multipart compose_object.
     
     Returns:
-        File data as bytes
+        Destination object name if successful
     """
-    global minio_client
-    if minio_client is None:
-        minio_client = get_minio_client()
+    minio_client = get_minio_client()
     
     try:
-        from io import BytesIO
+        stat = minio_client.stat_object(bucket_name, source_object_name)
         
-
-        response = minio_client.get_object(bucket_name, object_name)
-        file_data = response.read()
-        response.close()
-        response.release_conn()
+        if stat.size > MAX_SINGLE_COPY_SIZE:
+            minio_client.compose_object(
+                bucket_name,
+                dest_object_name,
+                [ComposeSource(bucket_name, source_object_name)]
+            )
+        else:
+            minio_client.copy_object(
+                bucket_name,
+                dest_object_name,
+                CopySource(bucket_name, source_object_name)
+            )
         
-        return file_data
+        return dest_object_name
     except S3Error as e:
-        print(f'Error downloading file from MinIO: {e}')
+        print(f'Error copying object in MinIO: {e}')
         raise
     except Exception as e:
-        print(f'Error downloading file from MinIO: {e}')
+        print(f'Error copying object in MinIO: {e}')
         raise
-
@@ -8,7 +8,7 @@ import os
 import json
 import time
 import jwt
-from .helpers import get_user_details_data, prepare_resume_sections, send_to_ollama
+from .helpers import get_user_details_data, prepare_resume_sections, send_to_ollama, RESUME_GENERATION_FIELDS
 
 JWT_SECRET = os.getenv('JWT_SECRET', 'your-secret-key-change-in-production')
 
@@ -111,7 +111,7 @@ def generate_resume_stream(request):
             yield f"data: {json.dumps({'error': 'Ollama configuration is missing. Please set OLLAMA_HOST, OLLAMA_PORT, and OLLAMA_MODEL environment variables.', 'type': 'error'})}\n\n"
             return
 
-        user_details = get_user_details_data(user_id_int)
+        user_details = get_user_details_data(user_id_int, RESUME_GENERATION_FIELDS)
         if not user_details:
             yield f"data: {json.dumps({'error': f'User with id {user_id_int} does not exist or has no data.', 'type': 'error'})}\n\n"
             return
@@ -0,0 +1,169 @@
+# Schema changes owned by this service.
+# The core tables are created by the main application and are not Django-managed, so these
+# idempotent statements are applied with `python manage.py apply_schema` instead of migrations.
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction; apply_schema runs in autocommit mode.
+import re
+
+
+# A failed or interrupted concurrent build leaves an INVALID index behind, which IF NOT EXISTS would skip
+CONCURRENT_INDEX_PATTERN = re.compile(
+    r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)', re.IGNORECASE
+)
+
+
+def concurrent_index_name(statement):
+    """Name of the index a CREATE INDEX CONCURRENTLY IF NOT EXISTS statement builds, or None"""
+    match = CONCURRENT_INDEX_PATTERN.search(statement)
+    return match.group(1) if match else None
+
+
+def drop_invalid_index(cursor, index_name):
+    """Drop the index if a previous concurrent build left it INVALID, so it is rebuilt. Returns True if dropped"""
+    cursor.execute(
+        "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)",
+        [index_name]
+    )
+    row = cursor.fetchone()
+    if not row or not row[0]:
+        return False
+
+    cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}')
+    return True
+
+
+SCHEMA_CHANGES = [
+    (
+        'resumes_object_keys',
+        [
+            "ALTER TABLE resumes ADD COLUMN IF NOT EXISTS object_key VARCHAR(1024)",
+            "ALTER TABLE resumes ADD COLUMN IF NOT EXISTS folder_key VARCHAR(1024)",
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_resumes_profile_folder_key
+            ON resumes (profile_id, folder_key) WHERE deleted_at IS NULL
+            """,
+        ],
+    ),
+    (
+        'resumes_folder_listing',
+        [
+            # Serves the keyset-paginated folder listing (ORDER BY created_at DESC, id DESC)
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_resumes_folder_listing
+            ON resumes (profile_id, folder_key, created_at DESC, id DESC) WHERE deleted_at IS NULL
+            """,
+        ],
+    ),
+    (
+        'resumes_object_key_lookup',
+        [
+            # Lets storage_gc match bucket listings against rows by object key
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_resumes_object_key ON resumes (object_key)",
+        ],
+    ),
+    (
+        'resume_blobs',
+        [
+            # Content-addressed storage: one object per distinct content, shared by reference-counted rows.
+            # sha256 is NULL for objects whose bytes were never hashed (presigned and pre-existing uploads).
+            """
+            CREATE TABLE IF NOT EXISTS resume_blobs (
+                id BIGSERIAL PRIMARY KEY,
+                sha256 CHAR(64) UNIQUE,
+                object_key VARCHAR(1024) NOT NULL UNIQUE,
+                size BIGINT,
+                content_type VARCHAR(255),
+                ref_count INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                updated_at TIMESTAMP WITH TIME ZONE NOT NULL
+            )
+            """,
+            "ALTER TABLE resumes ADD COLUMN IF NOT EXISTS blob_id BIGINT REFERENCES resume_blobs (id) ON DELETE SET NULL",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_resumes_blob_id ON resumes (blob_id)",
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_resume_blobs_unreferenced
+            ON resume_blobs (id) WHERE ref_count <= 0
+            """,
+        ],
+    ),
+    (
+        'resume_blobs_search',
+        [
+            # Text is extracted once per stored content, so every row sharing a blob shares its index entry
+            "ALTER TABLE resume_blobs ADD COLUMN IF NOT EXISTS content_tsv TSVECTOR",
+            "ALTER TABLE resume_blobs ADD COLUMN IF NOT EXISTS content_extracted_at TIMESTAMP WITH TIME ZONE",
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_resume_blobs_content_tsv
+            ON resume_blobs USING GIN (content_tsv)
+            """,
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_resume_blobs_pending_extraction
+            ON resume_blobs (id) WHERE content_extracted_at IS NULL
+            """,
+        ],
+    ),
+    (
+        'idempotency_keys',
+        [
+            # Stored results of requests made with an Idempotency-Key; status_code is NULL while in flight
+            """
+            CREATE TABLE IF NOT EXISTS idempotency_keys (
+                id BIGSERIAL PRIMARY KEY,
+                scope VARCHAR(255) NOT NULL,
+                idempotency_key VARCHAR(255) NOT NULL,
+                request_hash CHAR(64) NOT NULL,
+                status_code INTEGER,
+                response_body JSONB,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                UNIQUE (scope, idempotency_key)
+            )
+            """,
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_idempotency_keys_expires_at
+            ON idempotency_keys (expires_at)
+            """,
+        ],
+    ),
+    (
+        'profile_storage_usage',
+        [
+            # Size of each stored resume, so usage can be counted without listing the bucket
+            "ALTER TABLE resumes ADD COLUMN IF NOT EXISTS size BIGINT",
+            # Live bytes and files per profile, kept in step with resumes rows by the endpoints that
+            # insert or soft-delete them; reconcile_storage_usage recomputes it and backfills sizes
+            """
+            CREATE TABLE IF NOT EXISTS profile_storage_usage (
+                profile_id BIGINT PRIMARY KEY,
+                used_bytes BIGINT NOT NULL DEFAULT 0,
+                file_count INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP WITH TIME ZONE NOT NULL
+            )
+            """,
+            """
+            INSERT INTO profile_storage_usage (profile_id, used_bytes, file_count, updated_at)
+            SELECT profile_id, COALESCE(sum(size), 0), count(*), now()
+            FROM resumes WHERE deleted_at IS NULL
+            GROUP BY profile_id
+            ON CONFLICT (profile_id) DO NOTHING
+            """,
+        ],
+    ),
+    (
+        'folders_unique_live_key',
+        [
+            # Folders are database-only; this index is what detects create_folder collisions.
+            # Older duplicates could only come from racing creates, so all but the first are soft-deleted.
+            """
+            UPDATE folders f
+            SET deleted_at = now(), updated_at = now()
+            FROM folders kept
+            WHERE kept.profile_id = f.profile_id AND kept.folder_key = f.folder_key
+              AND kept.deleted_at IS NULL AND f.deleted_at IS NULL AND kept.id < f.id
+            """,
+            """
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_folders_profile_folder_key_live
+            ON folders (profile_id, folder_key) WHERE deleted_at IS NULL
+            """,
+        ],
+    ),
+]
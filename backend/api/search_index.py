@@ -0,0 +1,182 @@
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.db import connection, close_old_connections
+from django.utils import timezone
+
+from .storage import get_storage
+from .text_extraction import extract_text
+
+
+# Processes used for text extraction (CPU-bound, so threads would serialize on the GIL)
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '2'))
+# Concurrent object reads feeding the extraction processes
+EXTRACTION_FETCH_WORKERS = int(os.getenv('EXTRACTION_FETCH_WORKERS', '4'))
+# Blobs indexed per round trip by the background indexer
+EXTRACTION_BATCH_SIZE = 20
+# A document still being parsed after this long is indexed as empty and its worker process is killed
+EXTRACTION_TIMEOUT_SECONDS = float(os.getenv('EXTRACTION_TIMEOUT_SECONDS', '60'))
+
+TEXT_SEARCH_CONFIG = os.getenv('TEXT_SEARCH_CONFIG', 'english')
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+_index_queue = queue.Queue()
+_indexer_thread = None
+_indexer_lock = threading.Lock()
+
+
+def get_process_pool():
+    """Extraction process pool, created on first use. Spawned rather than forked, since the server is threaded"""
+    global _process_pool
+
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=max(1, EXTRACTION_WORKERS),
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+    return _process_pool
+
+
+def reset_process_pool(pool):
+    """Discard a broken or stuck pool so the next batch starts a fresh one"""
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+
+    # shutdown() cannot interrupt a worker stuck inside a parser, so its processes are terminated
+    for process in list((getattr(pool, '_processes', None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def extract_texts(contents):
+    """
+    Run extract_text on the process pool, one result per input. A document that times out gets ''
+    so it is not retried; documents lost to a broken or reset pool get None and stay pending.
+    """
+    pool = get_process_pool()
+    try:
+        futures = [pool.submit(extract_text, data) for data in contents]
+    except BrokenProcessPool:
+        reset_process_pool(pool)
+        return [None] * len(contents)
+
+    texts = []
+    for future in futures:
+        try:
+            texts.append(future.result(timeout=EXTRACTION_TIMEOUT_SECONDS))
+        except TimeoutError:
+            print(f'Warning: Text extraction took longer than {EXTRACTION_TIMEOUT_SECONDS}s; indexing as empty')
+            texts.append('')
+            reset_process_pool(pool)
+        except (BrokenProcessPool, CancelledError):
+            texts.append(None)
+            reset_process_pool(pool)
+    return texts
+
+
+def index_blobs(blob_rows):
+    """
+    Extract the text of the given (blob_id, object_key) rows and store it as content_tsv.
+    Objects are read on a thread pool and parsed on the process pool. Blobs whose format needs
+    a library that is not installed are left pending. Returns the number of blobs indexed.
+    """
+    blob_rows = list(blob_rows)
+    if not blob_rows:
+        return 0
+
+    def fetch(object_key):
+        try:
+            return get_storage().read(object_key)
+        except Exception as e:
+            print(f'Warning: Failed to read {object_key} for indexing: {str(e)}')
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(EXTRACTION_FETCH_WORKERS, len(blob_rows)))) as executor:
+        contents = list(executor.map(fetch, [object_key for _, object_key in blob_rows]))
+
+    fetched = [(blob_id, data) for (blob_id, _), data in zip(blob_rows, contents) if data is not None]
+    if not fetched:
+        return 0
+
+    texts = extract_texts([data for _, data in fetched])
+    extracted = [(blob_id, text) for (blob_id, _), text in zip(fetched, texts) if text is not None]
+    if not extracted:
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            UPDATE resume_blobs b
+            SET content_tsv = to_tsvector(%s::regconfig, v.content), content_extracted_at = %s
+            FROM unnest(%s::bigint[], %s::text[]) AS v(id, content)
+            WHERE b.id = v.id
+            """,
+            [
+                TEXT_SEARCH_CONFIG,
+                timezone.now(),
+                [blob_id for blob_id, _ in extracted],
+                [text for _, text in extracted],
+            ]
+        )
+    return len(extracted)
+
+
+def _run_indexer():
+    while True:
+        blob_ids = [_index_queue.get()]
+        while len(blob_ids) < EXTRACTION_BATCH_SIZE:
+            try:
+                blob_ids.append(_index_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            close_old_connections()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id, object_key FROM resume_blobs
+                    WHERE id = ANY(%s) AND content_extracted_at IS NULL
+                    """,
+                    [blob_ids]
+                )
+                blob_rows = cursor.fetchall()
+            index_blobs(blob_rows)
+        except Exception as e:
+            # Anything missed here is picked up by the index_resume_text command
+            print(f'Warning: Failed to index {len(blob_ids)} blob(s): {str(e)}')
+            connection.close()
+        finally:
+            for _ in blob_ids:
+                _index_queue.task_done()
+
+
+def schedule_indexing(blob_ids):
+    """
+    Queue blobs for text extraction by this worker's background indexer thread.
+    Call it from transaction.on_commit so the indexer can see the blob rows.
+    """
+    blob_ids = [blob_id for blob_id in blob_ids if blob_id is not None]
+    if not blob_ids:
+        return
+
+    global _indexer_thread
+    if _indexer_thread is None or not _indexer_thread.is_alive():
+        with _indexer_lock:
+            if _indexer_thread is None or not _indexer_thread.is_alive():
+                _indexer_thread = threading.Thread(target=_run_indexer, name='resume-indexer', daemon=True)
+                _indexer_thread.start()
+
+    for blob_id in blob_ids:
+        _index_queue.put(blob_id)
@@ -0,0 +1,345 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+
+from . import minio_utils
+from .minio_utils import MINIO_BUCKET, MINIO_PRESIGN_EXPIRY_SECONDS, UPLOAD_PART_SIZE
+
+
+# Which driver get_storage() returns: minio, local or memory
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'minio').lower()
+STORAGE_BUCKET = MINIO_BUCKET
+
+# Local filesystem driver: objects live under <LOCAL_STORAGE_ROOT>/<bucket>/<object name>.
+# Nothing here serves LOCAL_STORAGE_PUBLIC_URL: resumes.url is only a label under this backend unless
+# something in front of the service (e.g. a web server alias of the root) serves it. Files are read
+# through the download-resume endpoint, which streams them in proxy mode.
+LOCAL_STORAGE_ROOT = os.getenv('LOCAL_STORAGE_ROOT', str(settings.BASE_DIR / 'storage'))
+LOCAL_STORAGE_PUBLIC_URL = os.getenv('LOCAL_STORAGE_PUBLIC_URL', 'http://localhost:8000/storage')
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+StoredObject = namedtuple('StoredObject', ['name', 'size', 'content_type', 'etag', 'last_modified'])
+
+
+class PresignNotSupported(Exception):
+    """Raised by drivers that cannot hand out URLs clients use without going through this service"""
+    pass
+
+
+class StorageBackend:
+    """
+    Object storage used by the resume endpoints. Object names are keys inside one bucket.
+    Drivers implement the underscored primitives; put() adds timing common to all of them.
+    """
+    name = ''
+
+    def __init__(self, bucket_name=STORAGE_BUCKET):
+        self.bucket_name = bucket_name
+
+    def put(self, object_name, stream, length, content_type):
+        """
+        Store length bytes read from stream (anything with read(size)), one part in memory at a time.
+        Returns a dict with object_name, bytes, seconds and throughput_bytes_per_second.
+        """
+        started_at = time.monotonic()
+        self._put(object_name, stream, length, content_type)
+        elapsed = time.monotonic() - started_at
+
+        stored_bytes = getattr(stream, 'bytes_read', length)
+        return {
+            'object_name': object_name,
+            'bytes': stored_bytes,
+            'seconds': round(elapsed, 4),
+            'throughput_bytes_per_second': int(stored_bytes / elapsed) if elapsed > 0 else None
+        }
+
+    def _put(self, object_name, stream, length, content_type):
+        raise NotImplementedError
+
+    def get_stream(self, object_name, offset=0, length=0, chunk_size=STREAM_CHUNK_SIZE):
+        """Generator over the object's bytes (length 0 means to the end); closing it releases the connection"""
+        raise NotImplementedError
+
+    def read(self, object_name, offset=0, length=0):
+        """Read an object, or a byte range of it, into memory"""
+        return b''.join(self.get_stream(object_name, offset, length))
+
+    def stat(self, object_name):
+        """StoredObject for the object, or None if it does not exist"""
+        raise NotImplementedError
+
+    def copy(self, source_object_name, dest_object_name):
+        raise NotImplementedError
+
+    def delete_many(self, object_names):
+        """Delete objects; missing ones are not errors. Returns a list of (object name, error message)"""
+        raise NotImplementedError
+
+    def list(self, prefix='', recursive=True):
+        """Iterate StoredObjects under prefix in key order"""
+        raise NotImplementedError
+
+    def presign_get(self, object_name, filename=None, expires_seconds=MINIO_PRESIGN_EXPIRY_SECONDS):
+        raise PresignNotSupported(f'The {self.name} storage backend cannot presign downloads')
+
+    def presign_upload(self, object_name, content_type, size, expires_seconds=MINIO_PRESIGN_EXPIRY_SECONDS):
+        """(url, form fields) of a POST that only accepts exactly size bytes of content_type at object_name"""
+        raise PresignNotSupported(f'The {self.name} storage backend cannot presign uploads')
+
+    def public_url(self, object_name):
+        raise NotImplementedError
+
+
+class MinioStorage(StorageBackend):
+    """MinIO / S3 driver, backed by the shared client in minio_utils"""
+    name = 'minio'
+
+    def _put(self, object_name, stream, length, content_type):
+        minio_utils.upload_stream(self.bucket_name, object_name, stream, length, content_type)
+
+    def get_stream(self, object_name, offset=0, length=0, chunk_size=STREAM_CHUNK_SIZE):
+        response = minio_utils.get_object_stream(self.bucket_name, object_name, offset=offset, length=length)
+        try:
+            for chunk in response.stream(chunk_size):
+                yield chunk
+        finally:
+            response.close()
+            response.release_conn()
+
+    def read(self, object_name, offset=0, length=0):
+        return minio_utils.read_object_range(self.bucket_name, object_name, offset, length)
+
+    def stat(self, object_name):
+        stat = minio_utils.stat_object(self.bucket_name, object_name)
+        if stat is None:
+            return None
+        return StoredObject(object_name, stat.size, stat.content_type, stat.etag, stat.last_modified)
+
+    def copy(self, source_object_name, dest_object_name):
+        minio_utils.copy_object(self.bucket_name, source_object_name, dest_object_name)
+
+    def delete_many(self, object_names):
+        return minio_utils.remove_objects(self.bucket_name, object_names)
+
+    def list(self, prefix='', recursive=True):
+        minio_client = minio_utils.get_minio_client()
+        for item in minio_client.list_objects(self.bucket_name, prefix=prefix or None, recursive=recursive):
+            yield StoredObject(item.object_name, item.size, item.content_type, item.etag, item.last_modified)
+
+    def presign_get(self, object_name, filename=None, expires_seconds=MINIO_PRESIGN_EXPIRY_SECONDS):
+        return minio_utils.get_presigned_download_url(self.bucket_name, object_name, filename, expires_seconds)
+
+    def presign_upload(self, object_name, content_type, size, expires_seconds=MINIO_PRESIGN_EXPIRY_SECONDS):
+        minio_utils.ensure_bucket_exists(self.bucket_name)
+        return minio_utils.get_presigned_upload_post(
+            self.bucket_name, object_name, content_type, size, expires_seconds
+        )
+
+    def public_url(self, object_name):
+        return minio_utils.get_public_url(self.bucket_name, object_name)
+
+
+class LocalStorage(StorageBackend):
+    """Filesystem driver for development and benchmarks; writes are atomic renames"""
+    name = 'local'
+
+    def __init__(self, bucket_name=STORAGE_BUCKET, root=LOCAL_STORAGE_ROOT):
+        super().__init__(bucket_name)
+        self.root = os.path.realpath(os.path.join(root, bucket_name))
+
+    def _path(self, object_name):
+        path = os.path.realpath(os.path.join(self.root, object_name))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f'Object name escapes the storage root: {object_name}')
+        return path
+
+    def _write_atomically(self, path, write):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                write(temp_file)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _put(self, object_name, stream, length, content_type):
+        def write(temp_file):
+            while True:
+                chunk = stream.read(UPLOAD_PART_SIZE)
+                if not chunk:
+                    break
+                temp_file.write(chunk)
+
+        self._write_atomically(self._path(object_name), write)
+
+    def get_stream(self, object_name, offset=0, length=0, chunk_size=STREAM_CHUNK_SIZE):
+        with open(self._path(object_name), 'rb') as source:
+            source.seek(offset)
+            remaining = length or None
+            while remaining is None or remaining > 0:
+                chunk = source.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def _stored_object(self, object_name, path):
+        info = os.stat(path)
+        return StoredObject(
+            object_name,
+            info.st_size,
+            None,
+            f'{info.st_mtime_ns:x}-{info.st_size:x}',
+            datetime.fromtimestamp(info.st_mtime, tz=dt_timezone.utc)
+        )
+
+    def stat(self, object_name):
+        path = self._path(object_name)
+        if not os.path.isfile(path):
+            return None
+        return self._stored_object(object_name, path)
+
+    def copy(self, source_object_name, dest_object_name):
+        source_path = self._path(source_object_name)
+        with open(source_path, 'rb') as source:
+            self._write_atomically(self._path(dest_object_name), lambda temp_file: shutil.copyfileobj(source, temp_file))
+
+    def delete_many(self, object_names):
+        failures = []
+        for object_name in object_names:
+            try:
+                os.remove(self._path(object_name))
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                failures.append((object_name, str(e)))
+        return failures
+
+    def list(self, prefix='', recursive=True):
+        names = []
+        for directory, subdirectories, filenames in os.walk(self.root):
+            relative_directory = os.path.relpath(directory, self.root)
+            for filename in filenames:
+                if filename.startswith('.upload-'):
+                    continue
+                name = filename if relative_directory == '.' else f'{relative_directory}/{filename}'.replace(os.sep, '/')
+                if name.startswith(prefix) and (recursive or '/' not in name[len(prefix):]):
+                    names.append(name)
+
+        for name in sorted(names):
+            try:
+                yield self._stored_object(name, self._path(name))
+            except FileNotFoundError:
+                continue
+
+    def public_url(self, object_name):
+        """Recorded in resumes.url; not served by this service (see LOCAL_STORAGE_PUBLIC_URL)"""
+        return f'{LOCAL_STORAGE_PUBLIC_URL}/{self.bucket_name}/{object_name}'
+
+
+class MemoryStorage(StorageBackend):
+    """In-process driver for tests and benchmarks; contents are lost when the process exits"""
+    name = 'memory'
+
+    def __init__(self, bucket_name=STORAGE_BUCKET):
+        super().__init__(bucket_name)
+        self._objects = {}
+        self._lock = threading.Lock()
+
+    def _put(self, object_name, stream, length, content_type):
+        parts = []
+        while True:
+            chunk = stream.read(UPLOAD_PART_SIZE)
+            if not chunk:
+                break
+            parts.append(chunk)
+        data = b''.join(parts)
+
+        with self._lock:
+            self._objects[object_name] = (data, content_type, hashlib.md5(data).hexdigest(), datetime.now(dt_timezone.utc))
+
+    def get_stream(self, object_name, offset=0, length=0, chunk_size=STREAM_CHUNK_SIZE):
+        with self._lock:
+            entry = self._objects.get(object_name)
+        if entry is None:
+            raise FileNotFoundError(object_name)
+
+        data = entry[0]
+        end = offset + length if length else len(data)
+        for start in range(offset, min(end, len(data)), chunk_size):
+            yield data[start:min(start + chunk_size, end)]
+
+    def stat(self, object_name):
+        with self._lock:
+            entry = self._objects.get(object_name)
+        if entry is None:
+            return None
+        data, content_type, etag, last_modified = entry
+        return StoredObject(object_name, len(data), content_type, etag, last_modified)
+
+    def copy(self, source_object_name, dest_object_name):
+        with self._lock:
+            if source_object_name not in self._objects:
+                raise FileNotFoundError(source_object_name)
+            data, content_type, etag, _ = self._objects[source_object_name]
+            self._objects[dest_object_name] = (data, content_type, etag, datetime.now(dt_timezone.utc))
+
+    def delete_many(self, object_names):
+        with self._lock:
+            for object_name in object_names:
+                self._objects.pop(object_name, None)
+        return []
+
+    def list(self, prefix='', recursive=True):
+        with self._lock:
+            snapshot = sorted(
+                (name, entry) for name, entry in self._objects.items()
+                if name.startswith(prefix) and (recursive or '/' not in name[len(prefix):])
+            )
+        for name, (data, content_type, etag, last_modified) in snapshot:
+            yield StoredObject(name, len(data), content_type, etag, last_modified)
+
+    def public_url(self, object_name):
+        return f'memory://{self.bucket_name}/{object_name}'
+
+
+STORAGE_BACKENDS = {
+    MinioStorage.name: MinioStorage,
+    LocalStorage.name: LocalStorage,
+    MemoryStorage.name: MemoryStorage,
+}
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def create_storage(backend_name, **kwargs):
+    """Build a new driver by name (minio, local or memory)"""
+    if backend_name not in STORAGE_BACKENDS:
+        raise ValueError(
+            f'Unknown storage backend "{backend_name}". Expected one of: {", ".join(STORAGE_BACKENDS)}'
+        )
+    return STORAGE_BACKENDS[backend_name](**kwargs)
+
+
+def get_storage():
+    """The driver selected by STORAGE_BACKEND, shared by every thread in this process"""
+    global _storage
+
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage(STORAGE_BACKEND)
+    return _storage
@@ -0,0 +1,89 @@
+import os
+import queue
+import threading
+
+from .minio_utils import REMOVE_OBJECTS_BATCH_SIZE
+from .storage import get_storage
+
+
+# Upper bound on keys waiting in memory; enqueue blocks briefly rather than growing without limit
+PURGE_QUEUE_MAXSIZE = int(os.getenv('PURGE_QUEUE_MAXSIZE', '100000'))
+
+_purge_queue = queue.Queue(maxsize=PURGE_QUEUE_MAXSIZE)
+_purger_thread = None
+_purger_lock = threading.Lock()
+
+_purge_stats = {'queued': 0, 'removed': 0, 'failed': 0, 'batches': 0}
+_purge_stats_lock = threading.Lock()
+
+
+def _record(**counts):
+    with _purge_stats_lock:
+        for key, value in counts.items():
+            _purge_stats[key] += value
+
+
+def _next_batch():
+    """Block for the first key, then drain whatever else is waiting, up to one full batch"""
+    batch = [_purge_queue.get()]
+
+    while len(batch) < REMOVE_OBJECTS_BATCH_SIZE:
+        try:
+            batch.append(_purge_queue.get_nowait())
+        except queue.Empty:
+            break
+
+    return batch
+
+
+def _run_purger():
+    while True:
+        batch = _next_batch()
+
+        try:
+            failures = get_storage().delete_many(batch)
+            for object_name, message in failures:
+                print(f'Warning: Failed to purge object {object_name}: {message}')
+            _record(removed=len(batch) - len(failures), failed=len(failures), batches=1)
+        except Exception as e:
+            # Objects left behind here are picked up later by a storage GC pass
+            print(f'Warning: Failed to purge {len(batch)} object(s): {str(e)}')
+            _record(failed=len(batch), batches=1)
+
+        for _ in batch:
+            _purge_queue.task_done()
+
+
+def _ensure_purger_running():
+    global _purger_thread
+
+    if _purger_thread is not None and _purger_thread.is_alive():
+        return
+
+    with _purger_lock:
+        if _purger_thread is None or not _purger_thread.is_alive():
+            _purger_thread = threading.Thread(target=_run_purger, name='storage-purger', daemon=True)
+            _purger_thread.start()
+
+
+def enqueue_purge(object_names):
+    """
+    Queue objects for removal by this worker's background purger thread.
+    Call it from transaction.on_commit so nothing is removed for a rolled back delete.
+    """
+    object_names = [object_name for object_name in object_names if object_name]
+    if not object_names:
+        return
+
+    _ensure_purger_running()
+    for object_name in object_names:
+        _purge_queue.put(object_name)
+    _record(queued=len(object_names))
+
+
+def get_purge_stats():
+    """Counters of the background purger, plus the number of keys still waiting"""
+    with _purge_stats_lock:
+        stats = dict(_purge_stats)
+    stats['pending'] = _purge_queue.qsize()
+    return stats
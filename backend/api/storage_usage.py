@@ -0,0 +1,74 @@
+import os
+
+from django.utils import timezone
+
+
+# Bytes of live resumes each plan may store; plans not listed here get the basic quota
+STORAGE_QUOTA_BYTES = int(os.getenv('STORAGE_QUOTA_BYTES', str(100 * 1024 * 1024)))
+PRO_STORAGE_QUOTA_BYTES = int(os.getenv('PRO_STORAGE_QUOTA_BYTES', str(1024 * 1024 * 1024)))
+
+PLAN_STORAGE_QUOTAS = {
+    'pro': PRO_STORAGE_QUOTA_BYTES,
+}
+
+
+class StorageQuotaExceeded(Exception):
+    """Raised when a change would take a profile past its plan's storage quota"""
+    pass
+
+
+def get_storage_quota(cursor, user_id):
+    """Storage quota in bytes for the user's premium plan"""
+    cursor.execute(
+        """
+        SELECT pp.key FROM users u
+        LEFT JOIN premium_plans pp ON pp.id = u.premium_plan_id
+        WHERE u.id = %s
+        """,
+        [user_id]
+    )
+    row = cursor.fetchone()
+    plan_key = row[0] if row else None
+    return PLAN_STORAGE_QUOTAS.get(plan_key, STORAGE_QUOTA_BYTES)
+
+
+def get_storage_usage(cursor, profile_id):
+    """Return (used_bytes, file_count) for a profile from its usage counter"""
+    cursor.execute(
+        "SELECT used_bytes, file_count FROM profile_storage_usage WHERE profile_id = %s",
+        [profile_id]
+    )
+    row = cursor.fetchone()
+    return (row[0], row[1]) if row else (0, 0)
+
+
+def change_storage_usage(cursor, profile_id, bytes_delta, files_delta, quota=None):
+    """
+    Add to a profile's usage counter. Call it in the same transaction as the resumes rows it accounts for.
+    Growth beyond quota raises StorageQuotaExceeded before anything is changed; the counter row stays
+    locked until the transaction ends, so concurrent uploads of one profile cannot both pass the check.
+    Rows count COALESCE(size, 0), matching what reconcile_storage_usage recomputes.
+    """
+    bytes_delta = bytes_delta or 0
+    if not bytes_delta and not files_delta:
+        return
+
+    enforce = quota is not None and bytes_delta > 0
+    if enforce and bytes_delta > quota:
+        raise StorageQuotaExceeded(f'Storage quota of {quota} bytes exceeded')
+
+    cursor.execute(
+        """
+        INSERT INTO profile_storage_usage AS u (profile_id, used_bytes, file_count, updated_at)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (profile_id) DO UPDATE
+        SET used_bytes = u.used_bytes + EXCLUDED.used_bytes,
+            file_count = u.file_count + EXCLUDED.file_count,
+            updated_at = EXCLUDED.updated_at
+        WHERE NOT %s OR u.used_bytes + EXCLUDED.used_bytes <= %s
+        RETURNING used_bytes
+        """,
+        [profile_id, bytes_delta, files_delta, timezone.now(), enforce, quota]
+    )
+    if cursor.fetchone() is None:
+        raise StorageQuotaExceeded(f'Storage quota of {quota} bytes exceeded')
@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.db import connection
 import json
+from .identity import resolve_identity
 
 
 @api_view(['POST'])
@@ -32,29 +33,22 @@ def save_template(request):
 
         with connection.cursor() as cursor:
 
-            cursor.execute("SELECT id FROM users WHERE id = %s", [user_id_int])
-            user_row = cursor.fetchone()
+            identity = resolve_identity(request, cursor, user_id_int)
             
-            if not user_row:
+            if not identity:
                 return Response(
                     {'error': f'User with id {user_id_int} does not exist.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
 
 
-            cursor.execute(
-                "SELECT id FROM profiles WHERE user_id = %s LIMIT 1",
-                [user_id_int]
-            )
-            profile_row = cursor.fetchone()
-            
-            if not profile_row:
+            if not identity.profile_id:
                 return Response(
                     {'error': f'Profile not found for user_id {user_id_int}.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            profile_id = profile_row[0]
+            profile_id = identity.profile_id
 
 
             template_jsonb = json.dumps(template)
@@ -111,29 +105,22 @@ def restore_default_template(request):
 
         with connection.cursor() as cursor:
 
-            cursor.execute("SELECT id FROM users WHERE id = %s", [user_id_int])
-            user_row = cursor.fetchone()
+            identity = resolve_identity(request, cursor, user_id_int)
             
-            if not user_row:
+            if not identity:
                 return Response(
                     {'error': f'User with id {user_id_int} does not exist.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
 
 
-            cursor.execute(
-                "SELECT id FROM profiles WHERE user_id = %s LIMIT 1",
-                [user_id_int]
-            )
-            profile_row = cursor.fetchone()
-            
-            if not profile_row:
+            if not identity.profile_id:
                 return Response(
                     {'error': f'Profile not found for user_id {user_id_int}.'},
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            profile_id = profile_row[0]
+            profile_id = identity.profile_id
 
 
             cursor.execute(
@@ -0,0 +1,50 @@
+import io
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+try:
+    import docx
+except ImportError:
+    docx = None
+
+
+# Kept free of Django imports: extract_text runs in spawned worker processes.
+
+# A tsvector is limited to 1 MB; resumes are far below this, it only guards against pathological files
+MAX_EXTRACTED_CHARS = 500_000
+
+PDF_SIGNATURE = b'%PDF-'
+DOCX_SIGNATURE = b'PK\x03\x04'
+
+
+def extract_text(data):
+    """
+    Extract plain text from PDF or DOCX bytes.
+    Returns '' for unsupported or unreadable documents, and None when the library needed
+    for the format is not installed (so the document can be extracted later).
+    """
+    try:
+        if data.startswith(PDF_SIGNATURE):
+            if PdfReader is None:
+                return None
+            reader = PdfReader(io.BytesIO(data))
+            text = '\n'.join(page.extract_text() or '' for page in reader.pages)
+        elif data.startswith(DOCX_SIGNATURE):
+            if docx is None:
+                return None
+            document = docx.Document(io.BytesIO(data))
+            parts = [paragraph.text for paragraph in document.paragraphs]
+            for table in document.tables:
+                for row in table.rows:
+                    parts.extend(cell.text for cell in row.cells)
+            text = '\n'.join(parts)
+        else:
+            return ''
+    except Exception:
+        return ''
+
+    # PostgreSQL text cannot hold NUL characters
+    return text.replace('\x00', ' ')[:MAX_EXTRACTED_CHARS]
@@ -10,21 +10,31 @@ app_name = 'api'
 
 urlpatterns = [
     path('health/', views.health_check, name='health_check'),
+    path('storage/metrics/', views.storage_metrics, name='storage_metrics'),
     path('test/', views.test, name='test'),
     path('users/', views.get_users, name='get_users'),
     path('users/check-or-create/', views.check_or_create_user, name='check_or_create_user'),
     path('chat/', views.chat, name='chat'),
     path('generate-resume/', resume_views.generate_resume, name='generate_resume'),
     path('upload-resume/', file_storage_views.upload_resume, name='upload_resume'),
+    path('upload-resumes/', file_storage_views.upload_resumes, name='upload_resumes'),
+    path('upload-intent/', file_storage_views.create_upload_intent, name='create_upload_intent'),
+    path('upload-complete/', file_storage_views.complete_upload, name='complete_upload'),
     path('create-folder/', file_storage_views.create_folder, name='create_folder'),
     path('rename-file/', file_storage_views.rename_file, name='rename_file'),
     path('delete-file/', file_storage_views.delete_file, name='delete_file'),
     path('copy-file/', file_storage_views.copy_file, name='copy_file'),
     path('move-file/', file_storage_views.move_file, name='move_file'),
+    path('bulk-file-operation/', file_storage_views.bulk_file_operation, name='bulk_file_operation'),
     path('rename-folder/', file_storage_views.rename_folder, name='rename_folder'),
     path('delete-folder/', file_storage_views.delete_folder, name='delete_folder'),
     path('users/<int:user_id>/resumes/', file_storage_views.get_resumes, name='get_resumes'),
+    path('users/<int:user_id>/resumes/children/', file_storage_views.list_folder_children, name='list_folder_children'),
+    path('users/<int:user_id>/resumes/export/', file_storage_views.export_folder, name='export_folder'),
+    path('users/<int:user_id>/resumes/search/', file_storage_views.search_resumes, name='search_resumes'),
+    path('users/<int:user_id>/resumes/<int:resume_id>/download/', file_storage_views.download_resume, name='download_resume'),
     path('users/<int:user_id>/details/', user_details_views.get_user_details, name='get_user_details'),
+    path('users/details/batch/', user_details_views.get_user_details_batch, name='get_user_details_batch'),
     path('save-template/', template_views.save_template, name='save_template'),
     path('restore-default-template/', template_views.restore_default_template, name='restore_default_template'),
     path('token-management/', token_management_views.create_or_get_token, name='create_or_get_token'),
@@ -1,13 +1,19 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from .helpers import get_user_details_data
+from django.http import HttpResponse, StreamingHttpResponse
+from django.db import connection
+import json
+from .helpers import get_user_details_json, parse_user_details_fields, iter_user_details_batch
+from .etag_utils import compute_user_details_etag, etag_matches, etag_headers
 
 
 @api_view(['GET'])
 def get_user_details(request, user_id):
     """
     Get comprehensive user details including profile, projects, certifications, etc.
+    Optional ?fields=userProfile,projects limits the payload to the listed sections.
+    Supports conditional GET: a matching If-None-Match returns 304 without running the aggregation.
     """
     try:
 
@@ -19,16 +25,39 @@ def get_user_details(request, user_id):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        try:
+            fields = parse_user_details_fields(request.query_params.get('fields'))
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+
+        with connection.cursor() as cursor:
+            etag = compute_user_details_etag(cursor, user_id_int, ','.join(fields or ()))
+
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
 
-        user_details = get_user_details_data(user_id_int)
+
+        # Postgres already rendered the JSON; pass the text through instead of decoding and re-encoding it
+        user_details_json = get_user_details_json(user_id_int, fields)
         
-        if not user_details:
+        if not user_details_json:
             return Response(
                 {'error': f'User with id {user_id_int} does not exist or has no data.'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        return Response(user_details, status=status.HTTP_200_OK)
+        response = HttpResponse(
+            user_details_json.encode('utf-8'),
+            content_type='application/json',
+            status=status.HTTP_200_OK
+        )
+        for header, value in etag_headers(etag).items():
+            response[header] = value
+        return response
 
     except Exception as e:
         return Response(
@@ -36,3 +65,79 @@ def get_user_details(request, user_id):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+
+
+MAX_BATCH_USER_IDS = 5000
+
+
+def user_details_batch_stream(user_ids, fields):
+    """
+    Generator that yields one NDJSON line per requested user id.
+    """
+    try:
+        for user_id, details_json in iter_user_details_batch(user_ids, fields, as_text=True):
+            if details_json is None:
+                yield json.dumps({'user_id': user_id, 'error': f'User with id {user_id} does not exist or has no data.'}) + '\n'
+            else:
+                # jsonb text output never contains raw newlines, so it is safe to splice into an NDJSON line
+                yield f'{{"user_id": {user_id}, "details": {details_json}}}\n'
+    except Exception as e:
+        yield json.dumps({'error': f'Internal server error: {str(e)}'}) + '\n'
+
+
+@api_view(['POST'])
+def get_user_details_batch(request):
+    """
+    Get user details for many users in one request.
+    Expects: user_ids (list of integers), fields (optional, comma-separated string or list)
+    Streams newline-delimited JSON, one {"user_id", "details"} or {"user_id", "error"} object per line.
+    """
+    try:
+        user_ids = request.data.get('user_ids')
+
+        if not user_ids or not isinstance(user_ids, list):
+            return Response(
+                {'error': 'user_ids is required and must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if len(user_ids) > MAX_BATCH_USER_IDS:
+            return Response(
+                {'error': f'Too many user_ids. Maximum is {MAX_BATCH_USER_IDS} per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+
+        try:
+            user_ids_int = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid user_ids. Every id must be a valid integer.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        raw_fields = request.data.get('fields')
+        if isinstance(raw_fields, list):
+            raw_fields = ','.join(str(field) for field in raw_fields)
+
+        try:
+            fields = parse_user_details_fields(raw_fields)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        response = StreamingHttpResponse(
+            user_details_batch_stream(user_ids_int, fields),
+            content_type='application/x-ndjson'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    except Exception as e:
+        return Response(
+            {'error': f'Internal server error: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
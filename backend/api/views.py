@@ -5,6 +5,10 @@ from django.db import connection
 from django.utils import timezone
 import os
 import requests
+from .minio_utils import get_operation_stats, MINIO_POOL_MAXSIZE
+from .identity import invalidate_identity
+from .storage import get_storage
+from .storage_purger import get_purge_stats
 
 @api_view(['GET'])
 def health_check(request):
@@ -12,6 +16,17 @@ def health_check(request):
     return Response({'status': 'ok', 'message': 'Resume Generator API is running'}, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+def storage_metrics(request):
+    """Per-operation latency and error counters of this worker's MinIO client and purger"""
+    return Response({
+        'backend': get_storage().name,
+        'pool_maxsize': MINIO_POOL_MAXSIZE,
+        'operations': get_operation_stats(),
+        'purger': get_purge_stats()
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['GET', 'POST'])
 def test(request):
     """Simple test endpoint that returns true"""
@@ -48,6 +63,7 @@ def get_or_create_profile(cursor, user_id, name=None):
         profile_row = cursor.fetchone()
         profile_id = profile_row[0] if profile_row else None
         profile_name = name
+        invalidate_identity(user_id)
 
     return profile_id, profile_name
 
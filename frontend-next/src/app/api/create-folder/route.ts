@@ -14,10 +14,13 @@ export async function POST(request: NextRequest) {
       );
     }
 
+    const idempotencyKey = request.headers.get('Idempotency-Key');
+
     const response = await fetch(`${BACKEND_URL}/api/create-folder/`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
+        ...(idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {}),
       },
       body: JSON.stringify({
         user_id,
@@ -35,8 +35,11 @@ export async function POST(request: NextRequest) {
       backendFormData.append('folder_path', folder_path);
     }
 
+    const idempotencyKey = request.headers.get('Idempotency-Key');
+
     const response = await fetch(`${BACKEND_URL}/api/upload-resume/`, {
       method: 'POST',
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined,
       body: backendFormData,
     });
 
@@ -16,13 +16,26 @@ export async function GET(
       );
     }
 
+    const ifNoneMatch = request.headers.get('if-none-match');
+
     const response = await fetch(`${BACKEND_URL}/api/users/${userId}/details/`, {
       method: 'GET',
       headers: {
         'Content-Type': 'application/json',
+        ...(ifNoneMatch ? { 'If-None-Match': ifNoneMatch } : {}),
       },
+      cache: 'no-store',
     });
 
+    const etag = response.headers.get('etag');
+    const cacheHeaders: Record<string, string> = etag
+      ? { ETag: etag, 'Cache-Control': 'private, no-cache' }
+      : {};
+
+    if (response.status === 304) {
+      return new NextResponse(null, { status: 304, headers: cacheHeaders });
+    }
+
     if (!response.ok) {
       const errorData = await response.json().catch(() => ({ error: 'Unknown error' }));
       return NextResponse.json(
@@ -32,7 +45,7 @@ export async function GET(
     }
 
     const data = await response.json();
-    return NextResponse.json(data, { status: 200 });
+    return NextResponse.json(data, { status: 200, headers: cacheHeaders });
   } catch (error) {
     console.error('Error fetching user details from backend:', error);
     return NextResponse.json(